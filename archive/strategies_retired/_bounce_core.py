@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Helpers shared by the bounce backtest strategies (bounce_bt, bounce_bt_v2)."""
+
+from __future__ import annotations
+
+import math
+from bisect import bisect_left, bisect_right
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def atr(candles: List[Tuple[float, float, float, float]], period: int = 14) -> float:
+    """candles: list of (o,h,l,c)"""
+    if len(candles) < period + 1:
+        return float("nan")
+    trs: List[float] = []
+    for i in range(-period, 0):
+        o, h, l, c = candles[i]
+        _, _, _, prev_c = candles[i - 1]
+        tr = max(h - l, abs(h - prev_c), abs(l - prev_c))
+        trs.append(tr)
+    return sum(trs) / len(trs)
+
+
+def bind_store(store: Any) -> Tuple[Any, str, Any, Any]:
+    """(store, symbol, last_5m_ohlc, candles_1h_ohlc) looked up on `store`.
+
+    KlineStore exposes the two accessors as methods; other runners may pass raw data.
+    Callers may keep the tuple while the accessors are callable, checking
+    `bound[0] is store` before reuse.
+    """
+    return (
+        store,
+        getattr(store, "symbol", None) or "",
+        getattr(store, "last_5m_ohlc", None),
+        getattr(store, "candles_1h_ohlc", None),
+    )
+
+
+def wick_long(o: float, h: float, l: float, c: float) -> float:
+    # lower wick fraction
+    rng = max(1e-12, h - l)
+    return max(0.0, min(1.0, (min(o, c) - l) / rng))
+
+
+def wick_short(o: float, h: float, l: float, c: float) -> float:
+    # upper wick fraction
+    rng = max(1e-12, h - l)
+    return max(0.0, min(1.0, (h - max(o, c)) / rng))
+
+
+def wick_fraction(o: float, h: float, l: float, c: float, side: str) -> float:
+    if side == "long":
+        return wick_long(o, h, l, c)
+    return wick_short(o, h, l, c)
+
+
+def wick_fraction_array(o: np.ndarray, h: np.ndarray, l: np.ndarray, c: np.ndarray, side: str) -> np.ndarray:
+    """Vectorized wick_fraction over whole OHLC columns (offline precomputation)."""
+    rng = np.maximum(1e-12, h - l)
+    if side == "long":
+        w = (np.minimum(o, c) - l) / rng
+    else:
+        w = (h - np.maximum(o, c)) / rng
+    return np.clip(w, 0.0, 1.0)
+
+
+def _pivots(values: np.ndarray, window: int, high: bool) -> np.ndarray:
+    """Values strictly above (high) / below (low) their `window` neighbours on each side, in order."""
+    n = values.shape[0]
+    if n < 2 * window + 1:
+        return values[:0]
+    if window <= 0:
+        return values
+    reduce = np.maximum.reduce if high else np.minimum.reduce
+    left = reduce([np.roll(values, k) for k in range(1, window + 1)])
+    right = reduce([np.roll(values, -k) for k in range(1, window + 1)])
+    mask = (values > left) & (values > right) if high else (values < left) & (values < right)
+    mask[:window] = False
+    mask[-window:] = False
+    return values[mask]
+
+
+def swing_levels(highs: Sequence[float], lows: Sequence[float], window: int = 2) -> Tuple[List[float], List[float]]:
+    h = np.asarray(highs, dtype=np.float64)
+    l = np.asarray(lows, dtype=np.float64)
+    return _pivots(h, window, high=True).tolist(), _pivots(l, window, high=False).tolist()
+
+
+def cluster(levels: List[float], step: float) -> List[float]:
+    if not levels:
+        return []
+    if step <= 0 or not math.isfinite(step):
+        return sorted(levels)
+    buckets = {}
+    for x in levels:
+        k = round(x / step)
+        buckets.setdefault(k, []).append(x)
+    out = [sum(v) / len(v) for v in buckets.values()]
+    return sorted(out)
+
+
+def nearest_levels(supports: List[float], resists: List[float], price: float) -> Tuple[Optional[float], Optional[float]]:
+    """Highest support <= price and lowest resistance >= price; both lists sorted ascending (as from cluster)."""
+    i = bisect_right(supports, price)
+    j = bisect_left(resists, price)
+    return (supports[i - 1] if i > 0 else None), (resists[j] if j < len(resists) else None)
@@ -5,42 +5,18 @@ from __future__ import annotations
 
 import math
 from dataclasses import dataclass
-from typing import List, Optional, Tuple
-
-from .signals import TradeSignal
-
-
-def atr(candles: List[Tuple[float, float, float, float]], period: int = 14) -> float:
-    """candles: list of (o,h,l,c)"""
-    if len(candles) < period + 1:
-        return float("nan")
-    trs: List[float] = []
-    for i in range(-period, 0):
-        o, h, l, c = candles[i]
-        _, _, _, prev_c = candles[i - 1]
-        tr = max(h - l, abs(h - prev_c), abs(l - prev_c))
-        trs.append(tr)
-    return sum(trs) / len(trs)
+from typing import List, Optional, Sequence, Tuple
 
+import numpy as np
 
-def ema(values: List[float], period: int) -> float:
-    if not values:
-        return float("nan")
-    k = 2.0 / (period + 1.0)
-    e = values[0]
-    for v in values[1:]:
-        e = v * k + e * (1 - k)
-    return e
+from strategies._indicators import ema_last
 
-
-def wick_fraction(o: float, h: float, l: float, c: float, side: str) -> float:
-    rng = max(1e-12, h - l)
-    if side == "long":
-        return max(0.0, min(1.0, (min(o, c) - l) / rng))
-    return max(0.0, min(1.0, (h - max(o, c)) / rng))
+from ._bounce_core import atr, bind_store, nearest_levels, wick_long, wick_short
+from ._bounce_core import cluster as _cluster_impl, swing_levels as _swing_levels_impl
+from .signals import TradeSignal
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class BounceBTV2Config:
     atr_period_1h: int = 14
     swing_lookback_1h: int = 72
@@ -62,40 +38,36 @@ class BounceBTV2Strategy:
 
     def __init__(self, cfg: Optional[BounceBTV2Config] = None):
         self.cfg = cfg or BounceBTV2Config()
+        # bind_store() tuple for the last store seen, so accessors are looked up once per store
+        # without keeping earlier stores (e.g. previous months) alive.
+        self._bound: Optional[tuple] = None
+        # 1h bias only changes when a new 1h candle closes.
+        self._bias_key: Optional[tuple] = None
+        self._bias: Optional[int] = None
 
     @staticmethod
-    def _swing_levels(highs: List[float], lows: List[float], window: int = 2) -> Tuple[List[float], List[float]]:
-        swing_highs: List[float] = []
-        swing_lows: List[float] = []
-        n = len(highs)
-        for i in range(window, n - window):
-            h = highs[i]
-            l = lows[i]
-            if all(h > highs[i - j] for j in range(1, window + 1)) and all(h > highs[i + j] for j in range(1, window + 1)):
-                swing_highs.append(h)
-            if all(l < lows[i - j] for j in range(1, window + 1)) and all(l < lows[i + j] for j in range(1, window + 1)):
-                swing_lows.append(l)
-        return swing_highs, swing_lows
+    def _swing_levels(highs: Sequence[float], lows: Sequence[float], window: int = 2) -> Tuple[List[float], List[float]]:
+        return _swing_levels_impl(highs, lows, window)
 
     @staticmethod
     def _cluster(levels: List[float], step: float) -> List[float]:
-        if not levels:
-            return []
-        if step <= 0 or not math.isfinite(step):
-            return sorted(levels)
-        buckets = {}
-        for x in levels:
-            k = round(x / step)
-            buckets.setdefault(k, []).append(x)
-        out = [sum(v) / len(v) for v in buckets.values()]
-        return sorted(out)
-
-    def _trend_bias(self, closes_1h: List[float]) -> Optional[int]:
+        return _cluster_impl(levels, step)
+
+    def _trend_bias(self, closes_1h: np.ndarray, key: Optional[tuple] = None) -> Optional[int]:
         # 2 = bull, 0 = bear, 1 = neutral
+        if key is not None and key == self._bias_key:
+            return self._bias
+        bias = self._trend_bias_calc(closes_1h)
+        self._bias_key = key
+        self._bias = bias
+        return bias
+
+    def _trend_bias_calc(self, closes_1h: np.ndarray) -> Optional[int]:
         if len(closes_1h) < max(self.cfg.ema_fast_1h, self.cfg.ema_slow_1h) + 5:
             return None
-        ef = ema(closes_1h[-(self.cfg.ema_fast_1h * 3):], self.cfg.ema_fast_1h)
-        es = ema(closes_1h[-(self.cfg.ema_slow_1h * 3):], self.cfg.ema_slow_1h)
+        n = len(closes_1h)
+        ef = ema_last(closes_1h, n - self.cfg.ema_fast_1h * 3, self.cfg.ema_fast_1h)
+        es = ema_last(closes_1h, n - self.cfg.ema_slow_1h * 3, self.cfg.ema_slow_1h)
         if not math.isfinite(ef) or not math.isfinite(es):
             return None
         if ef > es:
@@ -105,32 +77,49 @@ class BounceBTV2Strategy:
         return 1
 
     def maybe_signal(self, store, ts_ms: int, last_price: float) -> Optional[TradeSignal]:
-        symbol = getattr(store, "symbol", None) or ""
-
-        last_5m = getattr(store, "last_5m_ohlc", None)
+        bound = self._bound
+        if bound is None or bound[0] is not store:
+            bound = bind_store(store)
+            if callable(bound[2]) and callable(bound[3]):
+                self._bound = bound
+        _, symbol, last_5m, candles_1h_ohlc = bound
+
+        # KlineStore exposes helpers as callables; other runners may pass raw data.
         if callable(last_5m):
             last_5m = last_5m()
 
-        candles_1h_ohlc = getattr(store, "candles_1h_ohlc", None)
+        if not symbol or last_5m is None:
+            return None
+        o5, h5, l5, c5 = last_5m
+        cfg = self.cfg
+        wf_min = cfg.wick_frac_min
+
+        # Cheap 5m candle-shape gate first: no rejection candle -> no swing/ATR work.
+        wf_long = wick_long(o5, h5, l5, c5)
+        wf_short = wick_short(o5, h5, l5, c5)
+        bull = c5 > o5 and wf_long >= wf_min
+        bear = c5 < o5 and wf_short >= wf_min
+        if not (bull or bear):
+            return None
+
         if callable(candles_1h_ohlc):
             candles_1h_ohlc = candles_1h_ohlc()
         if candles_1h_ohlc is None:
             candles_1h_ohlc = []
 
-        if not symbol or last_5m is None or not candles_1h_ohlc:
+        if not candles_1h_ohlc:
             return None
-        if len(candles_1h_ohlc) < max(self.cfg.swing_lookback_1h, self.cfg.atr_period_1h + 2):
+        if len(candles_1h_ohlc) < max(cfg.swing_lookback_1h, cfg.atr_period_1h + 2):
             return None
 
-        o5, h5, l5, c5 = last_5m
-
-        recent_1h = candles_1h_ohlc[-self.cfg.swing_lookback_1h:]
-        highs = [h for (_, h, _, _) in recent_1h]
-        lows = [l for (_, _, l, _) in recent_1h]
-        closes = [c for (_, _, _, c) in recent_1h]
+        recent_1h = candles_1h_ohlc[-cfg.swing_lookback_1h:]
+        arr = np.asarray(recent_1h, dtype=np.float64)
+        highs = arr[:, 1]
+        lows = arr[:, 2]
+        closes = arr[:, 3]
 
-        a = atr(candles_1h_ohlc[-(self.cfg.atr_period_1h + 2):], self.cfg.atr_period_1h)
-        if not math.isfinite(a) or a <= 0:
+        a = atr(candles_1h_ohlc[-(cfg.atr_period_1h + 2):], cfg.atr_period_1h)
+        if not (a > 0.0):  # also rejects NaN
             return None
 
         swing_highs, swing_lows = self._swing_levels(highs, lows, window=2)
@@ -138,35 +127,34 @@ class BounceBTV2Strategy:
         res_levels = self._cluster(swing_highs, step)
         sup_levels = self._cluster(swing_lows, step)
 
-        supports = [x for x in sup_levels if x <= c5]
-        resists = [x for x in res_levels if x >= c5]
-
-        support = max(supports) if supports else None
-        resist = min(resists) if resists else None
+        support, resist = nearest_levels(sup_levels, res_levels, c5)
 
-        zone = self.cfg.entry_zone_atr * a
+        zone = cfg.entry_zone_atr * a
+        sl_off = cfg.sl_atr_mult * a
+        rr = cfg.rr
 
-        bias = self._trend_bias(closes)
-        if not self.cfg.allow_countertrend and bias is None:
+        bias = self._trend_bias(closes, key=(len(candles_1h_ohlc), candles_1h_ohlc[-1]))
+        if not cfg.allow_countertrend and bias is None:
             return None
 
         # LONG bounce from support
         if support is not None and abs(c5 - support) <= zone:
-            if (not self.cfg.allow_countertrend) and bias == 0:
+            if (not cfg.allow_countertrend) and bias == 0:
                 return None
-            wf = wick_fraction(o5, h5, l5, c5, "long")
-            if wf >= self.cfg.wick_frac_min and c5 > o5:
+            if bull:
                 entry = c5
-                sl = support - self.cfg.sl_atr_mult * a
+                sl = support - sl_off
                 if sl < entry:
                     risk = entry - sl
                     # target: nearest resistance if RR ok, else fixed rr
-                    tp = entry + self.cfg.rr * risk
+                    tp = entry + rr * risk
                     if resist is not None:
                         rr_to_level = (resist - entry) / risk
-                        if rr_to_level >= self.cfg.min_rr_to_level:
+                        if rr_to_level >= cfg.min_rr_to_level:
                             tp = resist
-                    sig = TradeSignal(
+                    if not TradeSignal.levels_ok("long", entry, sl, tp):
+                        return None
+                    return TradeSignal(
                         strategy="bounce_v2",
                         symbol=symbol,
                         side="long",
@@ -175,24 +163,24 @@ class BounceBTV2Strategy:
                         tp=tp,
                         reason=f"bounce_v2 support {support:.6g}",
                     )
-                    return sig if sig.validate() else None
 
         # SHORT bounce from resistance
         if resist is not None and abs(resist - c5) <= zone:
-            if (not self.cfg.allow_countertrend) and bias == 2:
+            if (not cfg.allow_countertrend) and bias == 2:
                 return None
-            wf = wick_fraction(o5, h5, l5, c5, "short")
-            if wf >= self.cfg.wick_frac_min and c5 < o5:
+            if bear:
                 entry = c5
-                sl = resist + self.cfg.sl_atr_mult * a
+                sl = resist + sl_off
                 if sl > entry:
                     risk = sl - entry
-                    tp = entry - self.cfg.rr * risk
+                    tp = entry - rr * risk
                     if support is not None:
                         rr_to_level = (entry - support) / risk
-                        if rr_to_level >= self.cfg.min_rr_to_level:
+                        if rr_to_level >= cfg.min_rr_to_level:
                             tp = support
-                    sig = TradeSignal(
+                    if not TradeSignal.levels_ok("short", entry, sl, tp):
+                        return None
+                    return TradeSignal(
                         strategy="bounce_v2",
                         symbol=symbol,
                         side="short",
@@ -201,6 +189,5 @@ class BounceBTV2Strategy:
                         tp=tp,
                         reason=f"bounce_v2 resist {resist:.6g}",
                     )
-                    return sig if sig.validate() else None
 
         return None
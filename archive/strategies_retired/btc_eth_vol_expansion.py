@@ -1,59 +1,37 @@
 from __future__ import annotations
 
 import math
-import os
-import statistics
 from dataclasses import dataclass
-from typing import List, Optional
-
-from .signals import TradeSignal
-
-
-def _env_float(name: str, default: float) -> float:
-    v = os.getenv(name)
-    if v is None or not str(v).strip():
-        return default
-    try:
-        return float(str(v).strip())
-    except Exception:
-        return default
+from typing import Optional
 
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 
-def _env_int(name: str, default: int) -> int:
-    v = os.getenv(name)
-    if v is None or not str(v).strip():
-        return default
-    try:
-        return int(str(v).strip())
-    except Exception:
-        return default
+from strategies._env_utils import _env_snapshot, _env_symbol_lists, store_symbol_upper
+from strategies._klines import klines_array, klines_atr, klines_ema
 
-
-def _env_csv_set(name: str, default_csv: str = "") -> set[str]:
-    raw = os.getenv(name, default_csv) or ""
-    return {x.strip().upper() for x in str(raw).replace(";", ",").split(",") if x.strip()}
-
-
-def _ema(vals: List[float], period: int) -> float:
-    if not vals or period <= 0:
-        return float("nan")
-    k = 2.0 / (period + 1.0)
-    e = vals[0]
-    for v in vals[1:]:
-        e = v * k + e * (1.0 - k)
-    return e
+from .signals import TradeSignal
 
 
-def _atr(rows: List[list], period: int) -> float:
-    if len(rows) < period + 1:
-        return float("nan")
-    h = [float(r[2]) for r in rows]
-    l = [float(r[3]) for r in rows]
-    c = [float(r[4]) for r in rows]
-    trs: List[float] = []
-    for i in range(-period, 0):
-        trs.append(max(h[i] - l[i], abs(h[i] - c[i - 1]), abs(l[i] - c[i - 1])))
-    return sum(trs) / float(period) if trs else float("nan")
+# (env var, config attr, parser); str values are taken verbatim, like os.getenv.
+_VE_ENV = (
+    ("VE_TREND_TF", "trend_tf", str),
+    ("VE_SIGNAL_TF", "signal_tf", str),
+    ("VE_EVAL_TF_MIN", "eval_tf_min", int),
+    ("VE_TREND_EMA_FAST", "trend_ema_fast", int),
+    ("VE_TREND_EMA_SLOW", "trend_ema_slow", int),
+    ("VE_MIN_TREND_GAP_PCT", "min_trend_gap_pct", float),
+    ("VE_BB_PERIOD", "bb_period", int),
+    ("VE_BB_DEV", "bb_dev", float),
+    ("VE_SQUEEZE_LOOKBACK", "squeeze_lookback", int),
+    ("VE_SQUEEZE_PCTILE", "squeeze_pctile", float),
+    ("VE_BREAKOUT_LOOKBACK", "breakout_lookback", int),
+    ("VE_ATR_PERIOD", "atr_period", int),
+    ("VE_SL_ATR_MULT", "sl_atr_mult", float),
+    ("VE_RR", "rr", float),
+    ("VE_COOLDOWN_BARS_5M", "cooldown_bars_5m", int),
+    ("VE_MAX_SIGNALS_PER_DAY", "max_signals_per_day", int),
+)
 
 
 @dataclass
@@ -84,70 +62,85 @@ class BTCETHVolExpansionStrategy:
 
     def __init__(self, cfg: Optional[BTCETHVolExpansionConfig] = None):
         self.cfg = cfg or BTCETHVolExpansionConfig()
+        for attr, val in _env_snapshot(_VE_ENV).items():
+            setattr(self.cfg, attr, val)
 
-        self.cfg.trend_tf = os.getenv("VE_TREND_TF", self.cfg.trend_tf)
-        self.cfg.signal_tf = os.getenv("VE_SIGNAL_TF", self.cfg.signal_tf)
-        self.cfg.eval_tf_min = _env_int("VE_EVAL_TF_MIN", self.cfg.eval_tf_min)
-        self.cfg.trend_ema_fast = _env_int("VE_TREND_EMA_FAST", self.cfg.trend_ema_fast)
-        self.cfg.trend_ema_slow = _env_int("VE_TREND_EMA_SLOW", self.cfg.trend_ema_slow)
-        self.cfg.min_trend_gap_pct = _env_float("VE_MIN_TREND_GAP_PCT", self.cfg.min_trend_gap_pct)
-        self.cfg.bb_period = _env_int("VE_BB_PERIOD", self.cfg.bb_period)
-        self.cfg.bb_dev = _env_float("VE_BB_DEV", self.cfg.bb_dev)
-        self.cfg.squeeze_lookback = _env_int("VE_SQUEEZE_LOOKBACK", self.cfg.squeeze_lookback)
-        self.cfg.squeeze_pctile = _env_float("VE_SQUEEZE_PCTILE", self.cfg.squeeze_pctile)
-        self.cfg.breakout_lookback = _env_int("VE_BREAKOUT_LOOKBACK", self.cfg.breakout_lookback)
-        self.cfg.atr_period = _env_int("VE_ATR_PERIOD", self.cfg.atr_period)
-        self.cfg.sl_atr_mult = _env_float("VE_SL_ATR_MULT", self.cfg.sl_atr_mult)
-        self.cfg.rr = _env_float("VE_RR", self.cfg.rr)
-        self.cfg.cooldown_bars_5m = _env_int("VE_COOLDOWN_BARS_5M", self.cfg.cooldown_bars_5m)
-        self.cfg.max_signals_per_day = _env_int("VE_MAX_SIGNALS_PER_DAY", self.cfg.max_signals_per_day)
-
-        self._allow = _env_csv_set("VE_SYMBOL_ALLOWLIST", "BTCUSDT,ETHUSDT")
-        self._deny = _env_csv_set("VE_SYMBOL_DENYLIST")
+        self._allow, self._deny = _env_symbol_lists("VE_SYMBOL_ALLOWLIST", "VE_SYMBOL_DENYLIST", "BTCUSDT,ETHUSDT")
         self._cooldown = 0
         self._last_eval_bucket: Optional[int] = None
         self._day_key: Optional[int] = None
         self._day_signals = 0
-
-    def _trend_bias(self, rows_1h: List[list]) -> int:
-        if len(rows_1h) < self.cfg.trend_ema_slow + 5:
+        # The 1h bias only changes when the 1h bar changes; `klines_array` hands back the
+        # same array object until then, so the array itself is the cache key.
+        self._ema_state: dict = {"arr": None, "bias": None}
+        # Same for the squeeze verdict, which depends only on the 1h window.
+        self._squeeze_state: dict = {"arr": None, "ok": False}
+
+        # Per-tick constants, derived once from the resolved config.
+        cfg = self.cfg
+        self._eval_bucket_sec = max(1, int(cfg.eval_tf_min * 60))
+        self._bucket_lo = 0
+        self._bucket_hi = 0
+        self._cooldown_reset = max(0, int(cfg.cooldown_bars_5m))
+        self._brk_n = max(5, int(cfg.breakout_lookback))
+        self._need_1h = max(cfg.trend_ema_slow + 20, cfg.squeeze_lookback + 20)
+        self._need_15 = max(cfg.breakout_lookback + cfg.atr_period + 8, 80)
+        self._min_15 = cfg.breakout_lookback + cfg.atr_period + 2
+
+    def _trend_bias(self, arr_1h: np.ndarray) -> int:
+        if self._ema_state["arr"] is arr_1h:
+            return self._ema_state["bias"]
+        bias = self._trend_bias_calc(arr_1h)
+        self._ema_state["arr"] = arr_1h
+        self._ema_state["bias"] = bias
+        return bias
+
+    def _trend_bias_calc(self, arr_1h: np.ndarray) -> int:
+        if arr_1h.shape[0] < self.cfg.trend_ema_slow + 5:
             return 1
-        closes = [float(r[4]) for r in rows_1h]
-        ef = _ema(closes, self.cfg.trend_ema_fast)
-        es = _ema(closes, self.cfg.trend_ema_slow)
+        ef = klines_ema(arr_1h, self.cfg.trend_ema_fast)
+        es = klines_ema(arr_1h, self.cfg.trend_ema_slow)
         if not (math.isfinite(ef) and math.isfinite(es)):
             return 1
-        gap_pct = abs(ef - es) / max(1e-12, abs(closes[-1])) * 100.0
+        gap_pct = abs(ef - es) / max(1e-12, abs(float(arr_1h[-1, 3]))) * 100.0
         if gap_pct < self.cfg.min_trend_gap_pct:
             return 1
         return 2 if ef > es else 0
 
-    def _squeeze_ok(self, rows_1h: List[list]) -> bool:
+    def _squeeze_ok(self, arr_1h: np.ndarray) -> bool:
+        if self._squeeze_state["arr"] is arr_1h:
+            return self._squeeze_state["ok"]
+        ok = self._squeeze_calc(arr_1h)
+        self._squeeze_state["arr"] = arr_1h
+        self._squeeze_state["ok"] = ok
+        return ok
+
+    def _squeeze_calc(self, arr_1h: np.ndarray) -> bool:
         p = max(10, int(self.cfg.bb_period))
         need = max(p + 5, int(self.cfg.squeeze_lookback))
-        if len(rows_1h) < need:
+        if arr_1h.shape[0] < need:
             return False
-        closes = [float(r[4]) for r in rows_1h]
-        widths: List[float] = []
-        for i in range(p, len(closes)):
-            w = closes[i - p:i]
-            ma = sum(w) / float(p)
-            if ma == 0:
-                continue
-            sd = statistics.pstdev(w) if len(w) > 1 else 0.0
-            bb_w = (2.0 * self.cfg.bb_dev * sd) / abs(ma) * 100.0
-            widths.append(bb_w)
-        if len(widths) < 10:
+        # Window i covers closes[i - p:i] (it stops one bar short of the last close).
+        win = sliding_window_view(arr_1h[:-1, 3], p)
+        ma = win.mean(axis=1)
+        # Population std from the mean above (np.std would sum every window again).
+        dev = win - ma[:, None]
+        dev *= dev
+        sd = np.sqrt(dev.sum(axis=1) / p)
+        keep = ma != 0
+        widths = (2.0 * self.cfg.bb_dev * sd[keep]) / np.abs(ma[keep]) * 100.0
+        if widths.shape[0] < 10:
             return False
         cur = widths[-1]
-        ranked = sorted(widths[-int(self.cfg.squeeze_lookback):])
-        idx = max(0, min(len(ranked) - 1, int(len(ranked) * self.cfg.squeeze_pctile)))
-        thr = ranked[idx]
-        return cur <= thr
+        recent = widths[-int(self.cfg.squeeze_lookback):]
+        idx = max(0, min(len(recent) - 1, int(len(recent) * self.cfg.squeeze_pctile)))
+        # Only the idx-th smallest width is needed: a selection, not a full sort.
+        thr = np.partition(recent, idx)[idx]
+        return bool(cur <= thr)
 
     def maybe_signal(self, store, ts_ms: int, o: float, h: float, l: float, c: float, v: float = 0.0) -> Optional[TradeSignal]:
         _ = (o, h, l, v)
-        sym = str(getattr(store, "symbol", "")).upper()
+        sym = store_symbol_upper(store)
         if self._allow and sym not in self._allow:
             return None
         if sym in self._deny:
@@ -155,6 +148,10 @@ class BTCETHVolExpansionStrategy:
         if self._cooldown > 0:
             self._cooldown -= 1
             return None
+        # Still inside the last evaluated bucket (bounds kept in the caller's ts unit):
+        # nothing below can change the outcome, so skip the unit/day/bucket arithmetic.
+        if self._bucket_lo <= ts_ms < self._bucket_hi:
+            return None
 
         ts_sec = int(ts_ms // 1000 if ts_ms > 10_000_000_000 else ts_ms)
         day_key = ts_sec // 86400
@@ -164,41 +161,49 @@ class BTCETHVolExpansionStrategy:
         if self._day_signals >= self.cfg.max_signals_per_day:
             return None
 
-        bucket = ts_sec // max(1, int(self.cfg.eval_tf_min * 60))
+        bucket = ts_sec // self._eval_bucket_sec
         if self._last_eval_bucket == bucket:
             return None
         self._last_eval_bucket = bucket
-
-        rows_1h = store.fetch_klines(store.symbol, self.cfg.trend_tf, max(self.cfg.trend_ema_slow + 20, self.cfg.squeeze_lookback + 20)) or []
-        rows_15 = store.fetch_klines(store.symbol, self.cfg.signal_tf, max(self.cfg.breakout_lookback + self.cfg.atr_period + 8, 80)) or []
-        if len(rows_15) < self.cfg.breakout_lookback + self.cfg.atr_period + 2:
-            return None
-
-        bias = self._trend_bias(rows_1h)
+        scale = 1000 if ts_ms > 10_000_000_000 else 1
+        self._bucket_lo = bucket * self._eval_bucket_sec * scale
+        self._bucket_hi = self._bucket_lo + self._eval_bucket_sec * scale
+
+        # 1h gates first: both are cached per 1h bar and reject most buckets before the
+        # 15m window is fetched.
+        arr_1h = klines_array(store, self.cfg.trend_tf, self._need_1h)
+        bias = self._trend_bias(arr_1h)
         if bias == 1:
             return None
-        if not self._squeeze_ok(rows_1h):
+        if not self._squeeze_ok(arr_1h):
+            return None
+
+        arr_15 = klines_array(store, self.cfg.signal_tf, self._need_15)
+        if arr_15.shape[0] < self._min_15:
             return None
 
-        highs = [float(r[2]) for r in rows_15]
-        lows = [float(r[3]) for r in rows_15]
-        closes = [float(r[4]) for r in rows_15]
-        atr15 = _atr(rows_15, self.cfg.atr_period)
+        highs = arr_15[:, 1]
+        lows = arr_15[:, 2]
+        closes = arr_15[:, 3]
+        atr15 = klines_atr(arr_15, self.cfg.atr_period)
         if not math.isfinite(atr15) or atr15 <= 0:
             return None
 
-        brk_n = max(5, int(self.cfg.breakout_lookback))
-        hi = max(highs[-brk_n - 1:-1])
-        lo = min(lows[-brk_n - 1:-1])
-        cur = closes[-1]
-        prev = closes[-2]
+        brk_n = self._brk_n
+        # Only the level on the bias side can trigger; skip scanning the other one.
+        if bias == 2:
+            lvl = float(highs[-brk_n - 1:-1].max())
+        else:
+            lvl = float(lows[-brk_n - 1:-1].min())
+        cur = float(closes[-1])
+        prev = float(closes[-2])
 
-        if bias == 2 and cur > hi and prev <= hi:
+        if bias == 2 and cur > lvl and prev <= lvl:
             sl = cur - self.cfg.sl_atr_mult * atr15
             if sl >= cur:
                 return None
             tp = cur + self.cfg.rr * (cur - sl)
-            self._cooldown = max(0, int(self.cfg.cooldown_bars_5m))
+            self._cooldown = self._cooldown_reset
             self._day_signals += 1
             return TradeSignal(
                 strategy="btc_eth_vol_expansion",
@@ -210,12 +215,12 @@ class BTCETHVolExpansionStrategy:
                 reason="ve_long squeeze_breakout",
             )
 
-        if bias == 0 and cur < lo and prev >= lo:
+        if bias == 0 and cur < lvl and prev >= lvl:
             sl = cur + self.cfg.sl_atr_mult * atr15
             if sl <= cur:
                 return None
             tp = cur - self.cfg.rr * (sl - cur)
-            self._cooldown = max(0, int(self.cfg.cooldown_bars_5m))
+            self._cooldown = self._cooldown_reset
             self._day_signals += 1
             return TradeSignal(
                 strategy="btc_eth_vol_expansion",
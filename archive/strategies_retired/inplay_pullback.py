@@ -1,37 +1,25 @@
 from __future__ import annotations
 
+import bisect
 import os
-import inspect
-import math
-import asyncio
 from dataclasses import dataclass
-from typing import Optional, Any, Dict, List
+from typing import Optional, List
 
 from backtest.bt_types import TradeSignal
 from sr_inplay_retest import InPlayPullbackStrategy
+from strategies._engine_klines import engine_kline_fetcher
+from strategies._engine_kwargs import coerce_config_fields, engine_kwargs
+from strategies._sync_bridge import await_sync
 
-
-def _run_coro_sync(obj: Any) -> Any:
-    if asyncio.iscoroutine(obj):
-        try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                new_loop = asyncio.new_event_loop()
-                try:
-                    return new_loop.run_until_complete(obj)
-                finally:
-                    new_loop.close()
-            return loop.run_until_complete(obj)
-        except RuntimeError:
-            return asyncio.run(obj)
-    return obj
+_TRUTHY = frozenset({"1", "true", "yes", "on"})
+_FALSY = frozenset({"off", "0", "false", "none", ""})
 
 
 def _env_bool(name: str, default: bool) -> bool:
     v = os.getenv(name)
     if v is None:
         return default
-    return v.strip().lower() in {"1", "true", "yes", "on"}
+    return v.strip().lower() in _TRUTHY
 
 
 def _env_int(name: str, default: int) -> int:
@@ -109,8 +97,26 @@ class InPlayPullbackConfig:
     allow_longs: bool = True
     allow_shorts: bool = False
 
+    def __post_init__(self) -> None:
+        coerce_config_fields(self)
+
 
 class InPlayPullbackWrapper:
+    __slots__ = (
+        "cfg",
+        "_store",
+        "impl",
+        "_min_stop_pct",
+        "_max_stop_pct",
+        "_stop_gates_active",
+        "_exit_mode",
+        "_partial_rs",
+        "_partial_fracs",
+        "_trail_mult",
+        "_trail_period",
+        "_time_stop",
+    )
+
     def __init__(self, cfg: Optional[InPlayPullbackConfig] = None):
         if cfg is None:
             cfg = InPlayPullbackConfig()
@@ -136,8 +142,8 @@ class InPlayPullbackWrapper:
         self.cfg.breakout_buffer_atr = _env_float("PULLBACK_BREAKOUT_BUFFER_ATR", self.cfg.breakout_buffer_atr)
 
         self.cfg.regime_mode = os.getenv("PULLBACK_REGIME_MODE", self.cfg.regime_mode)
-        if str(os.getenv('PULLBACK_REGIME', '')).strip().lower() in ('1','true','yes','on'):
-            if str(self.cfg.regime_mode).strip().lower() in ('off','0','false','none',''):
+        if _env_bool("PULLBACK_REGIME", False):
+            if str(self.cfg.regime_mode).strip().lower() in _FALSY:
                 self.cfg.regime_mode = 'ema'
         self.cfg.regime_tf = os.getenv("PULLBACK_REGIME_TF", self.cfg.regime_tf)
         self.cfg.regime_ema_fast = _env_int("PULLBACK_REGIME_EMA_FAST", self.cfg.regime_ema_fast)
@@ -155,17 +161,24 @@ class InPlayPullbackWrapper:
 
         self._store = None
         self.impl: Optional[InPlayPullbackStrategy] = None
-
-    @staticmethod
-    def _hours_to_break_bars(lookback_h: int, tf_break: str) -> int:
-        try:
-            minutes = int(tf_break)
-            if minutes <= 0:
-                raise ValueError
-        except Exception:
-            minutes = 60
-        bars = int(math.ceil((lookback_h * 60) / minutes))
-        return max(10, bars)
+        self._resolve_runtime_env()
+
+    def _resolve_runtime_env(self) -> None:
+        """Parse the per-signal PULLBACK_* knobs once; like the cfg fields, env changes need a restart."""
+        self._min_stop_pct = _env_float('PULLBACK_MIN_STOP_PCT', 0.0)
+        self._max_stop_pct = _env_float('PULLBACK_MAX_STOP_PCT', 0.0)
+        self._stop_gates_active = self._min_stop_pct > 0 or self._max_stop_pct > 0
+        self._exit_mode = (os.getenv("PULLBACK_EXIT_MODE") or "fixed").strip().lower()
+        rs = _env_csv_floats("PULLBACK_PARTIAL_RS", [1.0, 2.0, 4.0])
+        fracs = _env_csv_floats("PULLBACK_PARTIAL_FRACS", [0.50, 0.25, 0.15])
+        if len(fracs) != len(rs):
+            fracs = [1.0 / len(rs)] * len(rs)
+        # Ascending and unique, so maybe_signal() builds the TP ladder already ordered.
+        self._partial_rs = tuple(sorted(set(rs)))
+        self._partial_fracs = tuple(fracs)
+        self._trail_mult = _env_float("PULLBACK_TRAIL_ATR_MULT", 2.5)
+        self._trail_period = _env_int("PULLBACK_TRAIL_ATR_PERIOD", 14)
+        self._time_stop = _env_int("PULLBACK_TIME_STOP_BARS", 288)
 
     def _ensure_impl(self, store) -> None:
         if self.impl is not None:
@@ -173,101 +186,10 @@ class InPlayPullbackWrapper:
 
         self._store = store
 
-        tf_break = self.cfg.tf_break
-        tf_entry = self.cfg.tf_entry
-        lookback_break_bars = self._hours_to_break_bars(self.cfg.lookback_h, tf_break)
-
-        def _fetch_klines(symbol: str, interval: str, limit: int):
-            raw = store.fetch_klines(symbol, interval, int(limit))
-            out: List[Dict[str, Any]] = []
-            for r in (raw or []):
-                if isinstance(r, dict):
-                    o = r.get("open", r.get("o"))
-                    h = r.get("high", r.get("h"))
-                    l = r.get("low", r.get("l"))
-                    c = r.get("close", r.get("c"))
-                    ts = r.get("startTime", r.get("ts", r.get("t")))
-                    v = r.get("volume", r.get("v", 0.0))
-                    out.append({
-                        "startTime": ts,
-                        "open": float(o),
-                        "high": float(h),
-                        "low": float(l),
-                        "close": float(c),
-                        "volume": float(v) if v is not None else 0.0,
-                    })
-                    continue
-
-                if hasattr(r, "o") and hasattr(r, "h") and hasattr(r, "l") and hasattr(r, "c"):
-                    ts = getattr(r, "ts", getattr(r, "t", None))
-                    v = getattr(r, "v", 0.0)
-                    out.append({
-                        "startTime": ts,
-                        "open": float(getattr(r, "o")),
-                        "high": float(getattr(r, "h")),
-                        "low": float(getattr(r, "l")),
-                        "close": float(getattr(r, "c")),
-                        "volume": float(v) if v is not None else 0.0,
-                    })
-                    continue
-
-                if isinstance(r, (list, tuple)) and len(r) >= 5:
-                    ts, o, h, l, c = r[0], r[1], r[2], r[3], r[4]
-                    v = r[5] if len(r) > 5 else 0.0
-                    out.append({
-                        "startTime": ts,
-                        "open": float(o),
-                        "high": float(h),
-                        "low": float(l),
-                        "close": float(c),
-                        "volume": float(v) if v is not None else 0.0,
-                    })
-                    continue
-
-            return out
-
-        candidate: Dict[str, Any] = {
-            "tf_break": tf_break,
-            "tf_entry": tf_entry,
-            "lookback_break_bars": int(lookback_break_bars),
-            "atr_period": int(self.cfg.atr_period),
-            "impulse_atr_mult": float(self.cfg.impulse_atr_mult),
-            "impulse_body_min_frac": float(self.cfg.impulse_body_min_frac),
-            "impulse_vol_mult": float(self.cfg.impulse_vol_mult),
-            "impulse_vol_period": int(self.cfg.impulse_vol_period),
-            "pullback_zone_atr": float(self.cfg.pullback_zone_atr),
-            "prebreak_reclaim_atr": float(self.cfg.prebreak_reclaim_atr),
-            "prebreak_max_dist_atr": float(self.cfg.prebreak_max_dist_atr),
-            "prebreak_sl_buffer_atr": float(self.cfg.prebreak_sl_buffer_atr),
-            "min_rr_to_level": float(self.cfg.min_rr_to_level),
-            "reclaim_body_frac": float(self.cfg.reclaim_body_frac),
-            "require_reclaim": bool(self.cfg.require_reclaim),
-            "allow_longs": bool(self.cfg.allow_longs),
-            "allow_shorts": bool(self.cfg.allow_shorts),
-            "max_wait_bars": int(self.cfg.max_wait_bars),
-            "range_atr_max": float(self.cfg.range_atr_max),
-            "breakout_buffer_atr": float(self.cfg.breakout_buffer_atr),
-            "regime_mode": str(self.cfg.regime_mode),
-            "regime_tf": str(self.cfg.regime_tf),
-            "regime_ema_fast": int(self.cfg.regime_ema_fast),
-            "regime_ema_slow": int(self.cfg.regime_ema_slow),
-            "regime_min_gap_atr": float(self.cfg.regime_min_gap_atr),
-            "regime_strict": bool(self.cfg.regime_strict),
-            "regime_price_filter": bool(self.cfg.regime_price_filter),
-            "regime_cache_sec": int(self.cfg.regime_cache_sec),
-            "chop_er_min": float(self.cfg.chop_er_min),
-            "chop_er_period": int(self.cfg.chop_er_period),
-            "chop_in_range_only": bool(self.cfg.chop_in_range_only),
-        }
-
-        sig = inspect.signature(InPlayPullbackStrategy.__init__)
-        accepted = set(sig.parameters.keys()) - {"self", "fetch_klines"}
-        filtered = {k: v for k, v in candidate.items() if k in accepted}
-
-        self.impl = InPlayPullbackStrategy(_fetch_klines, **filtered)
+        self.impl = InPlayPullbackStrategy(engine_kline_fetcher(store), **engine_kwargs(InPlayPullbackStrategy, self.cfg))
 
     def signal(self, store, ts_ms: int, last_price: float) -> Optional[TradeSignal]:
-        return _run_coro_sync(self.maybe_signal(store, ts_ms, last_price))
+        return await_sync(self.maybe_signal(store, ts_ms, last_price))
 
     async def maybe_signal(self, store, ts_ms: int, last_price: float) -> Optional[TradeSignal]:
         self._ensure_impl(store)
@@ -279,44 +201,46 @@ class InPlayPullbackWrapper:
             return None
 
         side = "long" if sig.side == "Buy" else "short"
-        entry = float(sig.entry)
-        sl = float(sig.sl)
-        tp = float(sig.tp)
-        level = float(sig.tp)  # for pullback, tp is the level
-
-        min_stop_pct = _env_float('PULLBACK_MIN_STOP_PCT', 0.0)
-        max_stop_pct = _env_float('PULLBACK_MAX_STOP_PCT', 0.0)
-        stop_pct = abs(entry - sl) / max(1e-12, entry)
-        if min_stop_pct > 0 and stop_pct < min_stop_pct:
-            return None
-        if max_stop_pct > 0 and stop_pct > max_stop_pct:
-            return None
+        # The engine builds entry/sl/tp from _get_num floats, so no casts here.
+        entry = sig.entry
+        sl = sig.sl
+        tp = sig.tp
+        level = tp  # for pullback, tp is the level
+
+        if self._stop_gates_active:
+            min_stop_pct = self._min_stop_pct
+            max_stop_pct = self._max_stop_pct
+            stop_pct = abs(entry - sl) / max(1e-12, entry)
+            if min_stop_pct > 0 and stop_pct < min_stop_pct:
+                return None
+            if max_stop_pct > 0 and stop_pct > max_stop_pct:
+                return None
 
         base_reason = getattr(sig, "reason", "pullback")
 
-        exit_mode = (os.getenv("PULLBACK_EXIT_MODE") or "fixed").strip().lower()
-        if exit_mode in {"runner", "managed"}:
+        if self._exit_mode in {"runner", "managed"}:
             risk = abs(entry - sl)
             if risk > 0:
-                rs = _env_csv_floats("PULLBACK_PARTIAL_RS", [1.0, 2.0, 4.0])
-                fracs = _env_csv_floats("PULLBACK_PARTIAL_FRACS", [0.50, 0.25, 0.15])
-                if len(fracs) != len(rs):
-                    fracs = [1.0 / len(rs)] * len(rs)
-
+                # Prices are monotone in r, so the ladder comes out sorted; only
+                # rounding collisions need dropping before the level is slotted in.
+                tps: List[float] = []
                 if side == "long":
-                    tps = [entry + (r * risk) for r in rs]
-                    if level > entry:
-                        tps = [level] + tps
-                    tps = sorted(set(tps))
+                    for r in self._partial_rs:
+                        px = entry + (r * risk)
+                        if not tps or px != tps[-1]:
+                            tps.append(px)
+                    if level > entry and level not in tps:
+                        bisect.insort(tps, level)
                 else:
-                    tps = [entry - (r * risk) for r in rs]
-                    if level < entry:
-                        tps = [level] + tps
-                    tps = sorted(set(tps), reverse=True)
-
-                trail_mult = _env_float("PULLBACK_TRAIL_ATR_MULT", 2.5)
-                trail_period = _env_int("PULLBACK_TRAIL_ATR_PERIOD", 14)
-                time_stop = _env_int("PULLBACK_TIME_STOP_BARS", 288)
+                    for r in self._partial_rs:
+                        px = entry - (r * risk)
+                        if not tps or px != tps[-1]:
+                            tps.append(px)
+                    if level < entry and level not in tps:
+                        i = 0
+                        while i < len(tps) and tps[i] > level:
+                            i += 1
+                        tps.insert(i, level)
 
                 return TradeSignal(
                     strategy="inplay_pullback",
@@ -326,10 +250,10 @@ class InPlayPullbackWrapper:
                     sl=sl,
                     tp=float(tps[-1]),
                     tps=tps,
-                    tp_fracs=fracs,
-                    trailing_atr_mult=trail_mult,
-                    trailing_atr_period=trail_period,
-                    time_stop_bars=time_stop,
+                    tp_fracs=list(self._partial_fracs),
+                    trailing_atr_mult=self._trail_mult,
+                    trailing_atr_period=self._trail_period,
+                    time_stop_bars=self._time_stop,
                     reason=(base_reason + ";runner"),
                 )
 
@@ -8,6 +8,8 @@ import os
 from dataclasses import dataclass, field
 from typing import Callable, Dict, List, Optional, Tuple
 
+import numpy as np
+
 from .metrics import Trade
 from strategies.signals import TradeSignal
 
@@ -49,6 +51,9 @@ class KlineStore:
         self.c15 = aggregate_candles(candles_5m, 3)
         self.c1h = aggregate_candles(candles_5m, 12)
         self.c4h = aggregate_candles(candles_5m, 48)
+        # 5m high/low columns for window max/min reductions (e.g. breakout reference levels).
+        self.c5_high_np = np.fromiter((c.h for c in candles_5m), dtype=np.float64, count=len(candles_5m))
+        self.c5_low_np = np.fromiter((c.l for c in candles_5m), dtype=np.float64, count=len(candles_5m))
         self.i5 = -1
 
     def set_index(self, i5: int) -> None:
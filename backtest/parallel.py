@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Fan a per-symbol signal replay out across CPU cores.
+
+Strategies keep state per instance only (cooldowns, day counters, caches), so a
+multi-symbol sweep is embarrassingly parallel on the symbol axis: every worker
+builds its own store + strategy and replays that symbol's 5m bars.
+
+`build_store`, `strategy_factory` and `signal_fn` are sent to worker processes,
+so they must be picklable (module-level functions or functools.partial).
+
+Example:
+
+  from functools import partial
+  from backtest.parallel import price_signal, run_parallel
+
+  if __name__ == "__main__":
+      sigs = run_parallel(["BTCUSDT", "ETHUSDT"], load_store, partial(BounceBTStrategy, cfg),
+                          signal_fn=price_signal)
+"""
+
+from __future__ import annotations
+
+import multiprocessing as mp
+import os
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from backtest.engine import Candle, KlineStore
+from strategies.signals import TradeSignal
+
+StoreBuilder = Callable[[str], KlineStore]
+StrategyFactory = Callable[[], Any]
+SignalFn = Callable[[Any, KlineStore, Candle], Optional[TradeSignal]]
+
+
+def ohlcv_signal(strategy: Any, store: KlineStore, bar: Candle) -> Optional[TradeSignal]:
+    """Default call convention: maybe_signal(store, ts_ms, o, h, l, c, v)."""
+    return strategy.maybe_signal(store, bar.ts, bar.o, bar.h, bar.l, bar.c, bar.v)
+
+
+def price_signal(strategy: Any, store: KlineStore, bar: Candle) -> Optional[TradeSignal]:
+    """Bounce-style call convention: maybe_signal(store, ts_ms, last_price)."""
+    return strategy.maybe_signal(store, bar.ts, bar.c)
+
+
+def sync_price_signal(strategy: Any, store: KlineStore, bar: Candle) -> Optional[TradeSignal]:
+    """Async-wrapper call convention: signal(store, ts_ms, last_price), the sync face of an async maybe_signal."""
+    return strategy.signal(store, bar.ts, bar.c)
+
+
+def _replay_symbol(job: Tuple[str, StoreBuilder, StrategyFactory, SignalFn]) -> Tuple[str, List[Tuple[int, TradeSignal]]]:
+    symbol, build_store, strategy_factory, signal_fn = job
+    store = build_store(symbol)
+    strategy = strategy_factory()
+    out: List[Tuple[int, TradeSignal]] = []
+    for i, bar in enumerate(store.c5):
+        store.set_index(i)
+        sig = signal_fn(strategy, store, bar)
+        if sig is not None:
+            out.append((i, sig))
+    return symbol, out
+
+
+def run_parallel(
+    symbol_list: Sequence[str],
+    build_store: StoreBuilder,
+    strategy_factory: StrategyFactory,
+    n_workers: Optional[int] = None,
+    *,
+    signal_fn: SignalFn = ohlcv_signal,
+) -> Dict[str, List[Tuple[int, TradeSignal]]]:
+    """Replay every symbol with a fresh strategy instance; returns {symbol: [(bar_index, signal), ...]}.
+
+    n_workers defaults to os.cpu_count(); with one worker (or one symbol) the
+    replay runs in-process, which keeps tracebacks and debuggers simple.
+    """
+    symbols = list(dict.fromkeys(symbol_list))
+    jobs = [(sym, build_store, strategy_factory, signal_fn) for sym in symbols]
+    workers = max(1, min(len(jobs), int(n_workers or os.cpu_count() or 1)))
+
+    results: Dict[str, List[Tuple[int, TradeSignal]]] = {}
+    if workers <= 1:
+        for job in jobs:
+            sym, sigs = _replay_symbol(job)
+            results[sym] = sigs
+        return results
+
+    with mp.Pool(processes=workers) as pool:
+        for sym, sigs in pool.imap_unordered(_replay_symbol, jobs):
+            results[sym] = sigs
+    return {sym: results[sym] for sym in symbols}
@@ -173,8 +173,11 @@ def efficiency_ratio(closes: List[float], period: int) -> float:
 def _atr(candles, period: int) -> float:
     if len(candles) < period + 2:
         return 0.0
+    # Only the last `period` true ranges are averaged, so for period > 0 only those
+    # are computed (start is the candle index of trs[-period]).
+    start = len(candles) - period if period > 0 else 1
     trs = []
-    for i in range(1, len(candles)):
+    for i in range(start, len(candles)):
         h = _get_num(candles[i], "high")
         l = _get_num(candles[i], "low")
         pc = _get_num(candles[i-1], "close")
@@ -604,8 +607,10 @@ class InPlayPullbackStrategy(InPlayRetestStrategy):
             if body_frac < self.impulse_body_min_frac:
                 impulse_ok = False
         if impulse_ok and self.impulse_vol_mult > 0.0 and self.impulse_vol_period > 1:
-            vols = [_get_num(x, "volume", "v") for x in htf]
-            baseline = sma(vols[:-1], self.impulse_vol_period)
+            # Only the impulse_vol_period candles before the last one feed the SMA; a
+            # shorter history yields fewer values and sma() returns NaN as before.
+            vols = [_get_num(x, "volume", "v") for x in htf[-(self.impulse_vol_period + 1):-1]]
+            baseline = sma(vols, self.impulse_vol_period)
             last_vol = _get_num(last, "volume", "v")
             if not (baseline > 0 and last_vol >= self.impulse_vol_mult * baseline):
                 impulse_ok = False
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Kline rows for the sr_inplay_retest engines (InPlayBreakoutStrategy, InPlayPullbackStrategy).
+
+The engines read bars as dicts with startTime/open/high/low/close/volume. Stores
+hand back dicts, Candle-like objects or Bybit list rows of strings; the
+converters below turn each shape into engine rows, and `engine_kline_fetcher`
+wraps a store so repeated fetches of the same window reuse the converted rows.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Optional
+
+
+def _kline_from_dict(r: Dict[str, Any]) -> Dict[str, Any]:
+    v = r.get("volume", r.get("v", 0.0))
+    return {
+        "startTime": r.get("startTime", r.get("ts", r.get("t"))),
+        "open": float(r.get("open", r.get("o"))),
+        "high": float(r.get("high", r.get("h"))),
+        "low": float(r.get("low", r.get("l"))),
+        "close": float(r.get("close", r.get("c"))),
+        "volume": float(v) if v is not None else 0.0,
+    }
+
+
+def _kline_from_attrs(r: Any) -> Dict[str, Any]:
+    v = getattr(r, "v", 0.0)
+    return {
+        "startTime": getattr(r, "ts", getattr(r, "t", None)),
+        "open": float(r.o),
+        "high": float(r.h),
+        "low": float(r.l),
+        "close": float(r.c),
+        "volume": float(v) if v is not None else 0.0,
+    }
+
+
+def _kline_from_seq(r: Any) -> Dict[str, Any]:
+    v = r[5] if len(r) > 5 else 0.0
+    return {
+        "startTime": r[0],
+        "open": float(r[1]),
+        "high": float(r[2]),
+        "low": float(r[3]),
+        "close": float(r[4]),
+        "volume": float(v) if v is not None else 0.0,
+    }
+
+
+def _roll_seq_rows(hit: tuple, raw: list) -> Optional[List[Dict[str, Any]]]:
+    """Converted rows for `raw` from the previous fetch of the same window (cf. _klines._roll_forward).
+
+    Engine rows are never mutated, so unchanged history is shared between calls:
+    same window -> only the forming last row is converted again; window slid by one
+    bar -> the last two rows are. Anything else returns None (convert everything).
+    """
+    key, old, next_ts = hit
+    n = len(raw)
+    if n != key[0] or n < 3:
+        return None
+    first = raw[0][0]
+    if first == key[1]:
+        return old[:-1] + [_kline_from_seq(raw[-1])]
+    if first == next_ts:
+        return old[1:-1] + [_kline_from_seq(raw[-2]), _kline_from_seq(raw[-1])]
+    return None
+
+
+def _kline_row(r: Any) -> Optional[Dict[str, Any]]:
+    """Engine row from a dict, a Candle-like object or a Bybit list row; None for anything else."""
+    if isinstance(r, dict):
+        return _kline_from_dict(r)
+    if hasattr(r, "o") and hasattr(r, "h") and hasattr(r, "l") and hasattr(r, "c"):
+        return _kline_from_attrs(r)
+    if isinstance(r, (list, tuple)) and len(r) >= 5:
+        return _kline_from_seq(r)
+    return None
+
+
+def _kline_rows(raw: List[Any]) -> List[Dict[str, Any]]:
+    """Per-row dispatch for mixed or unrecognised shapes; unsupported rows are dropped."""
+    out: List[Dict[str, Any]] = []
+    for r in raw:
+        row = _kline_row(r)
+        if row is not None:
+            out.append(row)
+    return out
+
+
+def _kline_builder_for(sample: Any) -> Callable[[Any], Any]:
+    """Converter for rows shaped like `sample`; `_kline_row` (per-row dispatch) if none fits."""
+    if isinstance(sample, dict):
+        return _kline_from_dict
+    if hasattr(sample, "o") and hasattr(sample, "h") and hasattr(sample, "l") and hasattr(sample, "c"):
+        return _kline_from_attrs
+    if isinstance(sample, (list, tuple)):
+        return _kline_from_seq
+    return _kline_row
+
+
+def engine_kline_fetcher(store) -> Callable[[str, str, int], List[Dict[str, Any]]]:
+    """fetch_klines(symbol, interval, limit) for an engine, returning engine rows from `store`.
+
+    Rows are shared between calls for an unchanged window, so callers must not mutate them.
+    """
+    row_builder: Optional[Callable[[Any], Dict[str, Any]]] = None
+    # (symbol, interval, limit) -> (rows key, converted rows, ts of the second row)
+    seq_cache: Dict[tuple, tuple] = {}
+
+    def _seq_klines(slot: tuple, raw: list) -> List[Dict[str, Any]]:
+        # Same keying as _klines.klines_array: the whole last row guards a forming live bar.
+        key = (len(raw), raw[0][0], tuple(raw[-1]))
+        hit = seq_cache.get(slot)
+        if hit is not None and hit[0] == key:
+            return hit[1]
+        rows = _roll_seq_rows(hit, raw) if hit is not None else None
+        if rows is None:
+            rows = [_kline_from_seq(r) for r in raw]
+        seq_cache[slot] = (key, rows, raw[1][0] if len(raw) > 1 else None)
+        return rows
+
+    def _fetch_klines(symbol: str, interval: str, limit: int):
+        nonlocal row_builder
+        raw = store.fetch_klines(symbol, interval, int(limit))
+        if not raw:
+            return []
+        if row_builder is None:
+            # A store's row shape is fixed, so pick the converter once.
+            row_builder = _kline_builder_for(raw[0])
+        if row_builder is _kline_from_seq:
+            try:
+                return _seq_klines((symbol, interval, int(limit)), raw)
+            except (AttributeError, IndexError, KeyError, TypeError):
+                return _kline_rows(raw)
+        if row_builder is not _kline_row:
+            try:
+                return [row_builder(r) for r in raw]
+            except (AttributeError, IndexError, KeyError, TypeError):
+                pass  # a row of another shape: fall back to per-row dispatch
+        return _kline_rows(raw)
+
+    return _fetch_klines
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Constructor kwargs for the sr_inplay_retest engines (InPlayBreakoutStrategy, InPlayPullbackStrategy).
+
+Wrapper configs mirror the engine's keyword arguments field for field, except
+lookback_h (hours), which the engine takes as lookback_break_bars on the
+tf_break grid. Configs call `coerce_config_fields` from __post_init__, so
+`engine_kwargs` passes field values through without per-kwarg casts.
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+from dataclasses import fields
+from typing import Any, Dict, FrozenSet, Tuple
+
+_CASTS = {"str": str, "int": int, "float": float, "bool": bool}
+
+# (engine class, config field values) -> engine kwargs, so a many-symbol scan builds
+# and filters them once. Engine instances are not shared: each keeps per-symbol state.
+_KWARG_CACHE: Dict[tuple, Dict[str, Any]] = {}
+
+
+@functools.lru_cache(maxsize=None)
+def _accepted_kwargs(engine_cls: type) -> FrozenSet[str]:
+    # inspect.signature is slow, so read each engine's signature once.
+    return frozenset(inspect.signature(engine_cls.__init__).parameters) - {"self", "fetch_klines"}
+
+
+@functools.lru_cache(maxsize=None)
+def config_field_casts(cfg_cls: type) -> Tuple[Tuple[str, type], ...]:
+    """(field name, cast) for each field of a config dataclass annotated str/int/float/bool."""
+    return tuple((f.name, _CASTS[f.type]) for f in fields(cfg_cls))
+
+
+def coerce_config_fields(cfg: Any) -> None:
+    """Cast each field to its annotated type when it differs (e.g. lookback_h=24.0, tf_break=240)."""
+    for name, cast in config_field_casts(type(cfg)):
+        v = getattr(cfg, name)
+        if type(v) is not cast:
+            setattr(cfg, name, cast(v))
+
+
+def hours_to_break_bars(lookback_h: int, tf_break: str) -> int:
+    """lookback_h hours as a count of tf_break bars (60m if tf_break is not a positive int), at least 10."""
+    try:
+        minutes = int(tf_break)
+        if minutes <= 0:
+            raise ValueError
+    except Exception:
+        minutes = 60
+    bars = int(-(-(lookback_h * 60) // minutes))  # ceil division, no float round-trip
+    return max(10, bars)
+
+
+def engine_kwargs(engine_cls: type, cfg: Any) -> Dict[str, Any]:
+    """Kwargs for engine_cls(fetch_klines, **kwargs) from cfg, shared by every equal config (read-only)."""
+    casts = config_field_casts(type(cfg))
+    key = (engine_cls,) + tuple(getattr(cfg, name) for name, _ in casts)
+    kwargs = _KWARG_CACHE.get(key)
+    if kwargs is not None:
+        return kwargs
+
+    accepted = _accepted_kwargs(engine_cls)
+    kwargs = {name: getattr(cfg, name) for name, _ in casts if name != "lookback_h" and name in accepted}
+    if "lookback_break_bars" in accepted:
+        kwargs["lookback_break_bars"] = hours_to_break_bars(cfg.lookback_h, cfg.tf_break)
+    _KWARG_CACHE[key] = kwargs
+    return kwargs
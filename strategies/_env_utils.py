@@ -0,0 +1,138 @@
+"""
+strategies/_env_utils.py — Env and symbol parsing shared by the table-configured strategies.
+No project dependencies. Safe to import anywhere.
+"""
+from __future__ import annotations
+
+import functools
+import os
+import sys
+from typing import Any, Dict, FrozenSet, Iterable, List, Tuple
+
+# (env var, config attr, parser) where parser is str, int, float or bool.
+EnvSpec = Iterable[Tuple[str, str, type]]
+
+
+def _env_csv_set(name: str, default_csv: str = "") -> set[str]:
+    raw = os.getenv(name, default_csv) or ""
+    return {x.strip().upper() for x in str(raw).replace(";", ",").split(",") if x.strip()}
+
+
+def store_symbol_upper(store) -> str:
+    """store.symbol uppercased and interned, cached on the store as `_upper_symbol`.
+
+    One .upper() per store instead of one per tick; stores that refuse new
+    attributes just recompute it.
+    """
+    sym = getattr(store, "_upper_symbol", None)
+    if sym is None:
+        sym = sys.intern(str(getattr(store, "symbol", "") or "").upper())
+        try:
+            store._upper_symbol = sym
+        except Exception:
+            pass
+    return sym
+
+
+# The _env_* readers are memoised per (name, default): env is not expected to change
+# mid-process, and every wrapper (one per symbol) reads the same ~45 variables, so
+# building wrappers in bulk touches os.environ once per variable (used by inplay_breakout).
+# typed=True keeps e.g. a default of 1 and 1.0 apart.
+@functools.lru_cache(maxsize=None, typed=True)
+def _env_str(name: str, default: Any = None) -> Any:
+    """os.getenv(name, default), verbatim."""
+    return os.getenv(name, default)
+
+
+@functools.lru_cache(maxsize=None, typed=True)
+def _env_bool(name: str, default: bool) -> bool:
+    v = os.getenv(name)
+    if v is None:
+        return default
+    return v.strip().lower() in {"1", "true", "yes", "on"}
+
+
+@functools.lru_cache(maxsize=None, typed=True)
+def _env_int(name: str, default: int) -> int:
+    v = os.getenv(name)
+    if v is None or not v.strip():
+        return default
+    try:
+        return int(v.strip())
+    except Exception:
+        return default
+
+
+@functools.lru_cache(maxsize=None, typed=True)
+def _env_float(name: str, default: float) -> float:
+    v = os.getenv(name)
+    if v is None or not v.strip():
+        return default
+    try:
+        return float(v.strip())
+    except Exception:
+        return default
+
+
+@functools.lru_cache(maxsize=None, typed=True)
+def _env_csv_floats(name: str, default: Tuple[float, ...]) -> Tuple[float, ...]:
+    v = os.getenv(name)
+    if v is None or not v.strip():
+        return tuple(default)
+    parts = [p.strip() for p in v.replace(';', ',').split(',')]
+    out: List[float] = []
+    for p in parts:
+        if not p:
+            continue
+        try:
+            out.append(float(p))
+        except Exception:
+            pass
+    return tuple(out) if out else tuple(default)
+
+def _env_overrides(spec: EnvSpec) -> Dict[str, object]:
+    """{config attr: parsed value} for every variable in `spec` that is set.
+
+    str values are taken verbatim (like os.getenv); bool is "1/true/yes/on";
+    blank or invalid numbers are left out so the config default stays.
+    """
+    env = os.environ
+    out: Dict[str, object] = {}
+    for name, attr, kind in spec:
+        raw = env.get(name)
+        if raw is None:
+            continue
+        if kind is str:
+            out[attr] = raw
+        elif kind is bool:
+            out[attr] = raw.strip().lower() in ("1", "true", "yes", "on")
+        elif raw.strip():
+            try:
+                out[attr] = kind(raw.strip())
+            except Exception:
+                continue
+    return out
+
+
+@functools.lru_cache(maxsize=None)
+def _env_snapshot(spec: Tuple[Tuple[str, str, type], ...]) -> Dict[str, object]:
+    """`_env_overrides(spec)` read once per process per spec table (callers must not mutate it)."""
+    return _env_overrides(spec)
+
+
+@functools.lru_cache(maxsize=None)
+def _env_symbol_lists(allow_env: str, deny_env: str, allow_default: str = "") -> Tuple[FrozenSet[str], FrozenSet[str]]:
+    """(allowlist, denylist) from two symbol env vars, read once per process.
+
+    Interned, like store_symbol_upper(), so hits compare by identity.
+    """
+    return (
+        frozenset(map(sys.intern, _env_csv_set(allow_env, allow_default))),
+        frozenset(map(sys.intern, _env_csv_set(deny_env))),
+    )
+
+
+def _reset_env_cache() -> None:
+    """Drop every memoised env read, snapshot and symbol list (tests / in-process env changes)."""
+    for fn in (_env_str, _env_bool, _env_int, _env_float, _env_csv_floats, _env_snapshot, _env_symbol_lists):
+        fn.cache_clear()
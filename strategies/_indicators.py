@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Shared numeric kernels for strategy indicators.
+
+Kernels take 1-D float64 NumPy arrays (views are fine) and are compiled with Numba when it
+is installed (`pip install numba`); without it they run as plain Python with
+identical results. `cache=True` keeps the compiled code in __pycache__ so only
+the first process pays the compile.
+
+Each kernel is declared with an explicit signature, so Numba compiles (or loads
+from the cache) at import time instead of on the first call inside a live
+bar. Arrays are any-layout float64 (column views of a kline array qualify) and
+integer arguments are int64, i.e. plain Python ints.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+try:
+    from numba import njit
+
+    HAVE_NUMBA = True
+except ImportError:  # numba is optional
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda f: f
+
+
+@njit("f8(f8[:], i8, i8)", cache=True)
+def ema_last(a: np.ndarray, start: int, period: int) -> float:
+    """Last EMA value of a[start:], seeded with a[start] (same recurrence as `_ema`).
+
+    Taking an offset instead of a slice avoids copying the window.
+    """
+    n = a.shape[0]
+    if start < 0:
+        start = 0
+    if start >= n or period <= 0:
+        return np.nan
+    k = 2.0 / (period + 1.0)
+    e = a[start]
+    for i in range(start + 1, n):
+        e = a[i] * k + e * (1.0 - k)
+    return e
+
+
+@njit("f8(f8, f8[:], i8, i8)", cache=True)
+def ema_extend(seed: float, a: np.ndarray, start: int, period: int) -> float:
+    """Continue an EMA from `seed` over a[start:] (same recurrence as `ema_last`)."""
+    k = 2.0 / (period + 1.0)
+    e = seed
+    for i in range(max(start, 0), a.shape[0]):
+        e = a[i] * k + e * (1.0 - k)
+    return e
+
+
+@njit("f8(f8, f8, i8)", cache=True)
+def _rsi_value(gains: float, losses: float, period: int) -> float:
+    if losses <= 1e-12:
+        return 100.0
+    rs = (gains / period) / (losses / period)
+    return 100.0 - 100.0 / (1.0 + rs)
+
+
+@njit("f8(f8[:], i8)", cache=True)
+def rsi_last(a: np.ndarray, period: int) -> float:
+    """Simple-average RSI of the last `period` changes (100 when there are no losses); NaN if too short."""
+    n = a.shape[0]
+    if n < period + 1:
+        return np.nan
+    gains = 0.0
+    losses = 0.0
+    for i in range(n - period, n):
+        d = a[i] - a[i - 1]
+        if d >= 0:
+            gains += d
+        else:
+            losses += -d
+    return _rsi_value(gains, losses, period)
+
+
+@njit("UniTuple(f8, 2)(f8[:], i8)", cache=True)
+def rsi_last_pair(a: np.ndarray, period: int):
+    """(rsi_last(a), rsi_last(a[:-1])) from one pass over the period + 1 changes they share.
+
+    Each side accumulates its own changes in the same order as `rsi_last`, so both
+    values match it exactly.
+    """
+    n = a.shape[0]
+    if n < period + 2:
+        return rsi_last(a, period), rsi_last(a[:max(n - 1, 0)], period)
+    g_cur = 0.0
+    l_cur = 0.0
+    g_prev = 0.0
+    l_prev = 0.0
+    first_cur = n - period
+    for i in range(n - period - 1, n):
+        d = a[i] - a[i - 1]
+        if i < n - 1:
+            if d >= 0:
+                g_prev += d
+            else:
+                l_prev += -d
+        if i >= first_cur:
+            if d >= 0:
+                g_cur += d
+            else:
+                l_cur += -d
+    return _rsi_value(g_cur, l_cur, period), _rsi_value(g_prev, l_prev, period)
+
+
+def _atr_last_loop(h: np.ndarray, l: np.ndarray, c: np.ndarray, period: int) -> float:
+    """Simple-mean ATR of the last `period` bars (TR against the previous close); NaN if too short."""
+    n = h.shape[0]
+    if period <= 0 or n < period + 1:
+        return np.nan
+    s = 0.0
+    for i in range(n - period, n):
+        pc = c[i - 1]
+        # Plain compares instead of a 3-arg max(): one select per step, same value.
+        tr = h[i] - l[i]
+        hc = abs(h[i] - pc)
+        if hc > tr:
+            tr = hc
+        lc = abs(l[i] - pc)
+        if lc > tr:
+            tr = lc
+        s += tr
+    return s / period
+
+
+def _atr_last_np(h: np.ndarray, l: np.ndarray, c: np.ndarray, period: int) -> float:
+    """NumPy twin of `_atr_last_loop`: vectorised TRs, then a left-to-right sum.
+
+    `sum()` over the list keeps the loop's addition order (np.sum is pairwise), so
+    both paths return the same float.
+    """
+    n = h.shape[0]
+    if period <= 0 or n < period + 1:
+        return np.nan
+    hh = h[n - period:]
+    ll = l[n - period:]
+    pc = c[n - period - 1:n - 1]
+    tr = np.maximum(np.maximum(hh - ll, np.abs(hh - pc)), np.abs(ll - pc))
+    return sum(tr.tolist(), 0.0) / period
+
+
+# Compiled, the loop beats any array temporaries; as plain Python it is the NumPy form.
+atr_last = njit("f8(f8[:], f8[:], f8[:], i8)", cache=True)(_atr_last_loop) if HAVE_NUMBA else _atr_last_np
+
+
+@njit("b1(f8, b1, f8, f8, f8)", cache=True)
+def breakout_ref_ok(ref: float, is_long: bool, entry: float, max_late_pct: float, min_pullback_pct: float) -> bool:
+    """Entry timing vs a breakout reference level (highest high for longs, lowest low for shorts).
+
+    False when the entry chases more than max_late_pct past the level or has pulled
+    back less than min_pullback_pct from it; a threshold <= 0 (or ref <= 0) skips that check.
+    """
+    if not (ref > 0):  # also NaN
+        return True
+    if is_long:
+        if max_late_pct > 0 and ((entry / ref) - 1.0) * 100.0 > max_late_pct:
+            return False
+        if min_pullback_pct > 0 and ((ref - entry) / ref) * 100.0 < min_pullback_pct:
+            return False
+        return True
+    if max_late_pct > 0 and ((ref / entry) - 1.0) * 100.0 > max_late_pct:
+        return False
+    if min_pullback_pct > 0 and ((entry - ref) / ref) * 100.0 < min_pullback_pct:
+        return False
+    return True
+
+
+def _breakout_guard_loop(
+    highs: np.ndarray,
+    lows: np.ndarray,
+    lo: int,
+    hi: int,
+    is_long: bool,
+    entry: float,
+    max_late_pct: float,
+    min_pullback_pct: float,
+) -> bool:
+    """`breakout_ref_ok` against max(highs[lo:hi]) for longs or min(lows[lo:hi]) for shorts."""
+    a = highs if is_long else lows
+    ref = a[lo]
+    for k in range(lo + 1, hi):
+        v = a[k]
+        if v > ref if is_long else v < ref:
+            ref = v
+        elif np.isnan(v):
+            return True  # ndarray max()/min() would be NaN, which skips both checks
+    return breakout_ref_ok(ref, is_long, entry, max_late_pct, min_pullback_pct)
+
+
+def _breakout_guard_np(
+    highs: np.ndarray,
+    lows: np.ndarray,
+    lo: int,
+    hi: int,
+    is_long: bool,
+    entry: float,
+    max_late_pct: float,
+    min_pullback_pct: float,
+) -> bool:
+    """NumPy twin of `_breakout_guard_loop`."""
+    ref = float(highs[lo:hi].max()) if is_long else float(lows[lo:hi].min())
+    return breakout_ref_ok(ref, is_long, entry, max_late_pct, min_pullback_pct)
+
+
+breakout_guard_ok = (
+    njit("b1(f8[:], f8[:], i8, i8, b1, f8, f8, f8)", cache=True)(_breakout_guard_loop) if HAVE_NUMBA else _breakout_guard_np
+)
+
+
+@njit("i8(f8[:], i8, i8, i8, f8, f8, f8)", cache=True)
+def trend_bias(
+    closes: np.ndarray,
+    fast: int,
+    slow: int,
+    lb: int,
+    gap_min_pct: float,
+    slope_min_pct: float,
+    min_abs_es_prev: float,
+) -> int:
+    """EMA trend regime of a close window: 2 up, 0 down, 1 neutral, -1 unusable.
+
+    ef/es are the fast/slow EMAs of the whole window and es_prev is es as of `lb`
+    bars ago. -1 means a non-finite EMA or |es_prev| <= min_abs_es_prev; callers
+    map it to their own "no trend" value.
+    """
+    n = closes.shape[0]
+    if n == 0 or fast <= 0 or slow <= 0:
+        return -1
+    # One fused pass for all three EMAs; es_prev is es after bar n - lb - 1.
+    kf = 2.0 / (fast + 1.0)
+    ks = 2.0 / (slow + 1.0)
+    cut = n - lb - 1
+    ef = closes[0]
+    es = closes[0]
+    es_prev = es if cut == 0 else np.nan
+    for i in range(1, n):
+        v = closes[i]
+        ef = v * kf + ef * (1.0 - kf)
+        es = v * ks + es * (1.0 - ks)
+        if i == cut:
+            es_prev = es
+    if not (np.isfinite(ef) and np.isfinite(es) and np.isfinite(es_prev)) or abs(es_prev) <= min_abs_es_prev:
+        return -1
+    gap_pct = abs(ef - es) / max(1e-12, abs(closes[n - 1])) * 100.0
+    if gap_pct < gap_min_pct:
+        return 1
+    slope_pct = (es - es_prev) / abs(es_prev) * 100.0
+    if ef > es and slope_pct >= slope_min_pct:
+        return 2
+    if ef < es and slope_pct <= -slope_min_pct:
+        return 0
+    return 1
+
+
+def ema(values, period: int) -> float:
+    """Last EMA value of a list or array, seeded with its first element; NaN when empty."""
+    return float(ema_last(np.asarray(values, dtype=np.float64), 0, period))
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Parsed-kline cache shared by the BTC/ETH trend strategies.
+
+`store.fetch_klines` returns rows of strings; strategies that evaluate every few
+minutes on hourly/4h bars would otherwise re-parse the same rows on every call.
+Whole-window indicators on a cached array (`klines_ema`, `klines_atr`) are memoised
+with it, so repeated buckets within a bar, and any strategy reading the same
+(symbol, tf, limit) window, reuse one computation.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from ._indicators import atr_last, ema_last
+
+# (symbol, tf, limit) -> (rows key, (N, 5) float64 o/h/l/c/v array, ts of the second row)
+_KLINE_CACHE: Dict[tuple, Tuple[tuple, np.ndarray, object]] = {}
+# id(array) -> (array, {(indicator, period): value}) for arrays currently in _KLINE_CACHE
+_ARRAY_STATS: Dict[int, Tuple[np.ndarray, Dict[tuple, float]]] = {}
+
+
+def _parse_rows(rows: list) -> np.ndarray:
+    try:
+        # One C-level pass over the whole table; the o/h/l/c/v block is a view.
+        # Ragged rows fall back to per-row parsing.
+        return np.asarray(rows, dtype=np.float64)[:, 1:6]
+    except (TypeError, ValueError, IndexError):
+        return np.asarray([[float(x) for x in r[1:6]] for r in rows], dtype=np.float64)
+
+
+def _roll_forward(hit: Tuple[tuple, np.ndarray, object], rows: list) -> Optional[np.ndarray]:
+    """New array for `rows` built from the cached one, parsing only the rows that can differ.
+
+    Same window (first ts unchanged): only the last, still-forming row is re-parsed.
+    Window slid by one bar: the old last row is now closed, so the last two rows are
+    re-parsed and the rest is a shifted copy. Anything else returns None (full parse).
+    """
+    key, old, next_ts = hit
+    n = len(rows)
+    if n != key[0] or n < 3:
+        return None
+    first = rows[0][0]
+    if first == key[1]:
+        tail = 1
+        keep = old[:-1]
+    elif first == next_ts:
+        tail = 2
+        keep = old[1:-1]
+    else:
+        return None
+    arr = np.empty_like(old)
+    arr[:-tail] = keep
+    arr[-tail:] = _parse_rows(rows[-tail:])
+    return arr
+
+
+def klines_array(store, tf: str, need: int) -> np.ndarray:
+    """store.fetch_klines as an (N, 5) o/h/l/c/v array; re-parsed only when the rows change.
+
+    The same array object is returned until the rows change, so callers may use it
+    as a cache key. The key includes the whole last row, which keeps a still-forming
+    live bar from being served stale. When the window just advances (or its last bar
+    updates), only the rows that can differ are parsed again.
+    """
+    rows = store.fetch_klines(store.symbol, tf, need) or []
+    if not rows:
+        return np.empty((0, 5), dtype=np.float64)
+    ck = (store.symbol, tf, need)
+    key = (len(rows), rows[0][0], tuple(rows[-1]))
+    hit = _KLINE_CACHE.get(ck)
+    if hit is not None and hit[0] == key:
+        return hit[1]
+    arr = None
+    if hit is not None:
+        try:
+            arr = _roll_forward(hit, rows)
+        except (TypeError, ValueError, IndexError):
+            arr = None
+        _ARRAY_STATS.pop(id(hit[1]), None)
+    if arr is None:
+        arr = _parse_rows(rows)
+    _KLINE_CACHE[ck] = (key, arr, rows[1][0] if len(rows) > 1 else None)
+    _ARRAY_STATS[id(arr)] = (arr, {})
+    return arr
+
+
+def _array_stat(arr: np.ndarray, name: str, period: int, fn: Callable[[np.ndarray, int], float]) -> float:
+    ent = _ARRAY_STATS.get(id(arr))
+    if ent is None or ent[0] is not arr:  # not a cached klines array: compute directly
+        return fn(arr, period)
+    memo = ent[1]
+    k = (name, period)
+    val = memo.get(k)
+    if val is None:
+        val = memo[k] = fn(arr, period)
+    return val
+
+
+def _close_ema(arr: np.ndarray, period: int) -> float:
+    return float(ema_last(arr[:, 3], 0, period))
+
+
+def _hlc_atr(arr: np.ndarray, period: int) -> float:
+    return float(atr_last(arr[:, 1], arr[:, 2], arr[:, 3], period))
+
+
+def klines_ema(arr: np.ndarray, period: int) -> float:
+    """EMA of the close column over the whole window (seeded at the first bar)."""
+    return _array_stat(arr, "ema", period, _close_ema)
+
+
+def klines_atr(arr: np.ndarray, period: int) -> float:
+    """Simple-mean ATR of the last `period` bars of the window."""
+    return _array_stat(arr, "atr", period, _hlc_atr)
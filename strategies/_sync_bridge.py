@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Sync entry point for the async strategy wrappers (`signal()` -> `await maybe_signal()`).
+
+Backtest loops call `signal()` once per bar, so the event loop is kept rather than
+created per call: each calling thread gets its own persistent loop, and a call
+made while a loop is already running goes through one shared daemon-thread loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import threading
+from typing import Any, Optional
+
+# Dedicated loop per calling thread (cf. run_month's bt_loop), created on first use and reused.
+_SYNC_LOOPS = threading.local()
+_BRIDGE_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_BRIDGE_LOCK = threading.Lock()
+
+
+def _bridge_loop() -> asyncio.AbstractEventLoop:
+    """Persistent loop on a daemon thread, for sync calls made while a loop is already running."""
+    global _BRIDGE_LOOP
+    with _BRIDGE_LOCK:
+        if _BRIDGE_LOOP is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="strategy-sync-loop", daemon=True).start()
+            _BRIDGE_LOOP = loop
+    return _BRIDGE_LOOP
+
+
+def await_sync(coro: Any) -> Any:
+    """Run the coroutine `coro` to completion from synchronous code and return its result."""
+    assert asyncio.iscoroutine(coro), coro
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        loop = getattr(_SYNC_LOOPS, "loop", None)
+        if loop is None or loop.is_closed():
+            loop = _SYNC_LOOPS.loop = asyncio.new_event_loop()
+            atexit.register(loop.close)
+        return loop.run_until_complete(coro)
+    # The running loop can't be re-entered from here; block on the bridge loop instead.
+    # Async callers should await maybe_signal() directly.
+    return asyncio.run_coroutine_threadsafe(coro, _bridge_loop()).result()
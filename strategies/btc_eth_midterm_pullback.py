@@ -1,71 +1,71 @@
 from __future__ import annotations
 
-import math
-import os
+import dataclasses
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Callable, Dict, Optional
 
-from .signals import TradeSignal
-
-
-def _env_float(name: str, default: float) -> float:
-    v = os.getenv(name)
-    if v is None or not str(v).strip():
-        return default
-    try:
-        return float(str(v).strip())
-    except Exception:
-        return default
-
-
-def _env_int(name: str, default: int) -> int:
-    v = os.getenv(name)
-    if v is None or not str(v).strip():
-        return default
-    try:
-        return int(str(v).strip())
-    except Exception:
-        return default
-
-
-def _env_bool(name: str, default: bool) -> bool:
-    v = os.getenv(name)
-    if v is None:
-        return default
-    return str(v).strip().lower() in {"1", "true", "yes", "on"}
-
-
-def _env_csv_set(name: str, default_csv: str = "") -> set[str]:
-    raw = os.getenv(name, default_csv) or ""
-    return {x.strip().upper() for x in str(raw).replace(";", ",").split(",") if x.strip()}
-
-
-def _ema(values: List[float], period: int) -> float:
-    if not values or period <= 0:
-        return float("nan")
-    k = 2.0 / (period + 1.0)
-    e = values[0]
-    for v in values[1:]:
-        e = v * k + e * (1.0 - k)
-    return e
+import numpy as np
 
-
-def _atr_from_rows(rows: List[list], period: int) -> float:
-    if len(rows) < period + 1:
-        return float("nan")
-    highs = [float(r[2]) for r in rows]
-    lows = [float(r[3]) for r in rows]
-    closes = [float(r[4]) for r in rows]
-    trs: List[float] = []
-    for i in range(-period, 0):
-        h = highs[i]
-        l = lows[i]
-        pc = closes[i - 1]
-        trs.append(max(h - l, abs(h - pc), abs(l - pc)))
-    return sum(trs) / float(period) if trs else float("nan")
+from ._env_utils import _env_snapshot, _env_symbol_lists
+from ._indicators import trend_bias
+from ._klines import klines_array, klines_atr, klines_ema
+from .signals import TradeSignal
 
 
-@dataclass
+# (env var, config attr, parser); str values are taken verbatim, like os.getenv.
+_MTPB_ENV = (
+    ("MTPB_TREND_TF", "trend_tf", str),
+    ("MTPB_SIGNAL_TF", "signal_tf", str),
+    ("MTPB_EVAL_TF_MIN", "eval_tf_min", int),
+    ("MTPB_TREND_EMA_FAST", "trend_ema_fast", int),
+    ("MTPB_TREND_EMA_SLOW", "trend_ema_slow", int),
+    ("MTPB_TREND_SLOPE_BARS", "trend_slope_bars", int),
+    ("MTPB_TREND_SLOPE_MIN_PCT", "trend_slope_min_pct", float),
+    ("MTPB_TREND_MIN_GAP_PCT", "trend_min_gap_pct", float),
+    ("MTPB_SIGNAL_EMA_PERIOD", "signal_ema_period", int),
+    ("MTPB_ATR_PERIOD", "atr_period", int),
+    ("MTPB_MAX_PULLBACK_PCT", "max_pullback_pct", float),
+    ("MTPB_LONG_MAX_PULLBACK_PCT", "long_max_pullback_pct", float),
+    ("MTPB_SHORT_MAX_PULLBACK_PCT", "short_max_pullback_pct", float),
+    ("MTPB_TOUCH_TOL_PCT", "touch_tol_pct", float),
+    ("MTPB_LONG_TOUCH_TOL_PCT", "long_touch_tol_pct", float),
+    ("MTPB_SHORT_TOUCH_TOL_PCT", "short_touch_tol_pct", float),
+    ("MTPB_RECLAIM_PCT", "reclaim_pct", float),
+    ("MTPB_LONG_RECLAIM_PCT", "long_reclaim_pct", float),
+    ("MTPB_SHORT_RECLAIM_PCT", "short_reclaim_pct", float),
+    ("MTPB_SWING_LOOKBACK_BARS", "swing_lookback_bars", int),
+    ("MTPB_MAX_ATR_PCT_1H", "max_atr_pct_1h", float),
+    ("MTPB_LONG_MAX_ATR_PCT_1H", "long_max_atr_pct_1h", float),
+    ("MTPB_SHORT_MAX_ATR_PCT_1H", "short_max_atr_pct_1h", float),
+    ("MTPB_SL_ATR_MULT", "sl_atr_mult", float),
+    ("MTPB_SWING_SL_BUFFER_ATR", "swing_sl_buffer_atr", float),
+    ("MTPB_RR", "rr", float),
+    ("MTPB_USE_RUNNER_EXITS", "use_runner_exits", bool),
+    ("MTPB_TP1_RR", "tp1_rr", float),
+    ("MTPB_TP2_RR", "tp2_rr", float),
+    ("MTPB_TP1_FRAC", "tp1_frac", float),
+    ("MTPB_TRAIL_ATR_MULT", "trail_atr_mult", float),
+    ("MTPB_TIME_STOP_BARS_5M", "time_stop_bars_5m", int),
+    ("MTPB_COOLDOWN_BARS_5M", "cooldown_bars_5m", int),
+    ("MTPB_MAX_SIGNALS_PER_DAY", "max_signals_per_day", int),
+    ("MTPB_ALLOW_LONGS", "allow_longs", bool),
+    ("MTPB_ALLOW_SHORTS", "allow_shorts", bool),
+)
+
+# Per-side knobs that fall back to the resolved shared value when their env var is unset.
+_MTPB_SIDE_DEFAULTS = {
+    "long_max_pullback_pct": "max_pullback_pct",
+    "short_max_pullback_pct": "max_pullback_pct",
+    "long_touch_tol_pct": "touch_tol_pct",
+    "short_touch_tol_pct": "touch_tol_pct",
+    "long_reclaim_pct": "reclaim_pct",
+    "short_reclaim_pct": "reclaim_pct",
+    "long_max_atr_pct_1h": "max_atr_pct_1h",
+    "short_max_atr_pct_1h": "max_atr_pct_1h",
+}
+
+
+@dataclass(slots=True, frozen=True)
 class BTCETHMidtermPullbackConfig:
     trend_tf: str = "240"  # 4h
     signal_tf: str = "60"  # 1h
@@ -112,209 +112,229 @@ class BTCETHMidtermPullbackConfig:
 class BTCETHMidtermPullbackStrategy:
     """BTC/ETH medium-term pullback: 4h trend + 1h pullback/reclaim entry."""
 
-    def __init__(self, cfg: Optional[BTCETHMidtermPullbackConfig] = None):
-        self.cfg = cfg or BTCETHMidtermPullbackConfig()
+    __slots__ = (
+        "cfg",
+        "_allow",
+        "_deny",
+        "_denied_fast",
+        "_cooldown",
+        "_last_eval_bucket",
+        "_day_key",
+        "_day_signals",
+        "_ema_state",
+        "_long_mults",
+        "_short_mults",
+        "_max_atr_pct",
+        "_handlers",
+    )
 
-        self.cfg.trend_tf = os.getenv("MTPB_TREND_TF", self.cfg.trend_tf)
-        self.cfg.signal_tf = os.getenv("MTPB_SIGNAL_TF", self.cfg.signal_tf)
-        self.cfg.eval_tf_min = _env_int("MTPB_EVAL_TF_MIN", self.cfg.eval_tf_min)
-        self.cfg.trend_ema_fast = _env_int("MTPB_TREND_EMA_FAST", self.cfg.trend_ema_fast)
-        self.cfg.trend_ema_slow = _env_int("MTPB_TREND_EMA_SLOW", self.cfg.trend_ema_slow)
-        self.cfg.trend_slope_bars = _env_int("MTPB_TREND_SLOPE_BARS", self.cfg.trend_slope_bars)
-        self.cfg.trend_slope_min_pct = _env_float("MTPB_TREND_SLOPE_MIN_PCT", self.cfg.trend_slope_min_pct)
-        self.cfg.trend_min_gap_pct = _env_float("MTPB_TREND_MIN_GAP_PCT", self.cfg.trend_min_gap_pct)
-        self.cfg.signal_ema_period = _env_int("MTPB_SIGNAL_EMA_PERIOD", self.cfg.signal_ema_period)
-        self.cfg.atr_period = _env_int("MTPB_ATR_PERIOD", self.cfg.atr_period)
-        self.cfg.max_pullback_pct = _env_float("MTPB_MAX_PULLBACK_PCT", self.cfg.max_pullback_pct)
-        self.cfg.long_max_pullback_pct = _env_float("MTPB_LONG_MAX_PULLBACK_PCT", self.cfg.max_pullback_pct)
-        self.cfg.short_max_pullback_pct = _env_float("MTPB_SHORT_MAX_PULLBACK_PCT", self.cfg.max_pullback_pct)
-        self.cfg.touch_tol_pct = _env_float("MTPB_TOUCH_TOL_PCT", self.cfg.touch_tol_pct)
-        self.cfg.long_touch_tol_pct = _env_float("MTPB_LONG_TOUCH_TOL_PCT", self.cfg.touch_tol_pct)
-        self.cfg.short_touch_tol_pct = _env_float("MTPB_SHORT_TOUCH_TOL_PCT", self.cfg.touch_tol_pct)
-        self.cfg.reclaim_pct = _env_float("MTPB_RECLAIM_PCT", self.cfg.reclaim_pct)
-        self.cfg.long_reclaim_pct = _env_float("MTPB_LONG_RECLAIM_PCT", self.cfg.reclaim_pct)
-        self.cfg.short_reclaim_pct = _env_float("MTPB_SHORT_RECLAIM_PCT", self.cfg.reclaim_pct)
-        self.cfg.swing_lookback_bars = _env_int("MTPB_SWING_LOOKBACK_BARS", self.cfg.swing_lookback_bars)
-        self.cfg.max_atr_pct_1h = _env_float("MTPB_MAX_ATR_PCT_1H", self.cfg.max_atr_pct_1h)
-        self.cfg.long_max_atr_pct_1h = _env_float("MTPB_LONG_MAX_ATR_PCT_1H", self.cfg.max_atr_pct_1h)
-        self.cfg.short_max_atr_pct_1h = _env_float("MTPB_SHORT_MAX_ATR_PCT_1H", self.cfg.max_atr_pct_1h)
-        self.cfg.sl_atr_mult = _env_float("MTPB_SL_ATR_MULT", self.cfg.sl_atr_mult)
-        self.cfg.swing_sl_buffer_atr = _env_float("MTPB_SWING_SL_BUFFER_ATR", self.cfg.swing_sl_buffer_atr)
-        self.cfg.rr = _env_float("MTPB_RR", self.cfg.rr)
-        self.cfg.use_runner_exits = _env_bool("MTPB_USE_RUNNER_EXITS", self.cfg.use_runner_exits)
-        self.cfg.tp1_rr = _env_float("MTPB_TP1_RR", self.cfg.tp1_rr)
-        self.cfg.tp2_rr = _env_float("MTPB_TP2_RR", self.cfg.tp2_rr)
-        self.cfg.tp1_frac = _env_float("MTPB_TP1_FRAC", self.cfg.tp1_frac)
-        self.cfg.trail_atr_mult = _env_float("MTPB_TRAIL_ATR_MULT", self.cfg.trail_atr_mult)
-        self.cfg.time_stop_bars_5m = _env_int("MTPB_TIME_STOP_BARS_5M", self.cfg.time_stop_bars_5m)
-        self.cfg.cooldown_bars_5m = _env_int("MTPB_COOLDOWN_BARS_5M", self.cfg.cooldown_bars_5m)
-        self.cfg.max_signals_per_day = _env_int("MTPB_MAX_SIGNALS_PER_DAY", self.cfg.max_signals_per_day)
-        self.cfg.allow_longs = _env_bool("MTPB_ALLOW_LONGS", self.cfg.allow_longs)
-        self.cfg.allow_shorts = _env_bool("MTPB_ALLOW_SHORTS", self.cfg.allow_shorts)
-
-        self._allow = _env_csv_set("MTPB_SYMBOL_ALLOWLIST", "BTCUSDT,ETHUSDT")
-        self._deny = _env_csv_set("MTPB_SYMBOL_DENYLIST")
+    def __init__(self, cfg: Optional[BTCETHMidtermPullbackConfig] = None):
+        cfg = cfg or BTCETHMidtermPullbackConfig()
+
+        env = _env_snapshot(_MTPB_ENV)
+        overrides = dict(env)
+        for attr, base in _MTPB_SIDE_DEFAULTS.items():
+            if attr not in env:
+                overrides[attr] = overrides.get(base, getattr(cfg, base))
+        self.cfg = cfg = dataclasses.replace(cfg, **overrides)
+        # ema1h multipliers for the (touch, reclaim) tests and the shared ATR% cap,
+        # fixed for the life of the config.
+        self._long_mults = (1.0 + cfg.long_touch_tol_pct / 100.0, 1.0 + cfg.long_reclaim_pct / 100.0)
+        self._short_mults = (1.0 - cfg.short_touch_tol_pct / 100.0, 1.0 - cfg.short_reclaim_pct / 100.0)
+        self._max_atr_pct = max(float(cfg.long_max_atr_pct_1h), float(cfg.short_max_atr_pct_1h))
+        # bias -> entry handler; neutral/unknown bias and disabled sides have none.
+        self._handlers: Dict[Optional[int], Callable[..., Optional[TradeSignal]]] = {}
+        if cfg.allow_longs:
+            self._handlers[2] = self._handle_long
+        if cfg.allow_shorts:
+            self._handlers[0] = self._handle_short
+
+        self._allow, self._deny = _env_symbol_lists("MTPB_SYMBOL_ALLOWLIST", "MTPB_SYMBOL_DENYLIST", "BTCUSDT,ETHUSDT")
+        # raw store.symbol -> blocked by allow/deny lists (decided once per symbol)
+        self._denied_fast: Dict[str, bool] = {}
 
         self._cooldown = 0
         self._last_eval_bucket: Optional[int] = None
         self._day_key: Optional[int] = None
         self._day_signals = 0
+        # 4h bias only changes when the trend bar changes; `klines_array` hands back the
+        # same array object until then, so the array itself is the cache key.
+        self._ema_state: dict = {"arr": None, "bias": None}
 
     def _trend_bias(self, store) -> Optional[int]:
         lb = max(4, int(self.cfg.trend_slope_bars))
         need = max(self.cfg.trend_ema_slow + lb + 5, 260)
-        rows = store.fetch_klines(store.symbol, self.cfg.trend_tf, need) or []
-        if len(rows) < self.cfg.trend_ema_slow + lb + 2:
+        arr = klines_array(store, self.cfg.trend_tf, need)
+        if arr.shape[0] < self.cfg.trend_ema_slow + lb + 2:
             return None
 
-        closes = [float(r[4]) for r in rows]
-        ef = _ema(closes, self.cfg.trend_ema_fast)
-        es = _ema(closes, self.cfg.trend_ema_slow)
-        es_prev = _ema(closes[:-lb], self.cfg.trend_ema_slow)
-        if not (math.isfinite(ef) and math.isfinite(es) and math.isfinite(es_prev)):
-            return None
-        if es_prev == 0:
-            return None
+        if self._ema_state["arr"] is arr:
+            return self._ema_state["bias"]
+        bias = self._trend_bias_calc(arr, lb)
+        self._ema_state["arr"] = arr
+        self._ema_state["bias"] = bias
+        return bias
+
+    def _trend_bias_calc(self, arr: np.ndarray, lb: int) -> Optional[int]:
+        cfg = self.cfg
+        bias = int(
+            trend_bias(
+                arr[:, 3],
+                int(cfg.trend_ema_fast),
+                int(cfg.trend_ema_slow),
+                lb,
+                float(cfg.trend_min_gap_pct),
+                float(cfg.trend_slope_min_pct),
+                0.0,  # only an exactly-zero es_prev is unusable
+            )
+        )
+        return None if bias < 0 else bias
 
-        last_c = max(1e-12, abs(closes[-1]))
-        gap_pct = abs(ef - es) / last_c * 100.0
-        if gap_pct < float(self.cfg.trend_min_gap_pct):
-            return 1
+    def _handle_long(self, store, px: float, ema1h: float, atr1h: float, atr_pct_1h: float, arr_1h: np.ndarray) -> Optional[TradeSignal]:
+        # Long: 4h uptrend + 1h pullback to EMA20 + reclaim.
+        cfg = self.cfg
+        if atr_pct_1h > float(cfg.long_max_atr_pct_1h):
+            return None
+        cur_c = float(arr_1h[-1, 3])
+        prev_c = float(arr_1h[-2, 3])
+        sl_off = cfg.sl_atr_mult * atr1h
+        swing_buf = cfg.swing_sl_buffer_atr * atr1h
+        look = max(3, min(arr_1h.shape[0], int(cfg.swing_lookback_bars)))
+        swing_low = float(arr_1h[-look:, 2].min())
+        touch_mult, reclaim_mult = self._long_mults
+        # One short-circuit chain: touch, reclaim, then the pullback depth.
+        if (
+            swing_low <= ema1h * touch_mult
+            and cur_c >= ema1h * reclaim_mult
+            and prev_c <= ema1h * 1.003
+            and max(0.0, (ema1h - swing_low) / max(1e-12, ema1h) * 100.0) <= cfg.long_max_pullback_pct
+        ):
+            swing_sl = swing_low - swing_buf
+            atr_sl = px - sl_off
+            sl = min(swing_sl, atr_sl)
+            if sl >= px:
+                return None
+            risk = px - sl
+            tp1 = px + float(cfg.tp1_rr) * risk
+            tp2 = px + float(cfg.tp2_rr) * risk
+            tp = px + cfg.rr * risk
+            self._cooldown = max(0, int(cfg.cooldown_bars_5m))
+            self._day_signals += 1
+            sig = TradeSignal(
+                strategy="btc_eth_midterm_pullback",
+                symbol=store.symbol,
+                side="long",
+                entry=px,
+                sl=float(sl),
+                tp=float(tp),
+                reason=f"mtpb_long trend4h pullback1h ema={cfg.signal_ema_period}",
+            )
+            if cfg.use_runner_exits:
+                tp1_frac = min(0.9, max(0.1, float(cfg.tp1_frac)))
+                sig.tps = [float(tp1), float(tp2)]
+                sig.tp_fracs = [tp1_frac, max(0.0, 1.0 - tp1_frac)]
+                sig.trailing_atr_mult = max(0.0, float(cfg.trail_atr_mult))
+                sig.trailing_atr_period = max(5, int(cfg.atr_period))
+                sig.time_stop_bars = max(0, int(cfg.time_stop_bars_5m))
+            return sig
+        return None
 
-        slope_pct = (es - es_prev) / abs(es_prev) * 100.0
-        if ef > es and slope_pct >= self.cfg.trend_slope_min_pct:
-            return 2  # uptrend
-        if ef < es and slope_pct <= -self.cfg.trend_slope_min_pct:
-            return 0  # downtrend
-        return 1  # neutral
+    def _handle_short(self, store, px: float, ema1h: float, atr1h: float, atr_pct_1h: float, arr_1h: np.ndarray) -> Optional[TradeSignal]:
+        # Short: 4h downtrend + 1h pullback to EMA20 + reclaim below EMA.
+        cfg = self.cfg
+        if atr_pct_1h > float(cfg.short_max_atr_pct_1h):
+            return None
+        cur_c = float(arr_1h[-1, 3])
+        prev_c = float(arr_1h[-2, 3])
+        sl_off = cfg.sl_atr_mult * atr1h
+        swing_buf = cfg.swing_sl_buffer_atr * atr1h
+        look = max(3, min(arr_1h.shape[0], int(cfg.swing_lookback_bars)))
+        swing_high = float(arr_1h[-look:, 1].max())
+        touch_mult, reclaim_mult = self._short_mults
+        if (
+            swing_high >= ema1h * touch_mult
+            and cur_c <= ema1h * reclaim_mult
+            and prev_c >= ema1h * 0.997
+            and max(0.0, (swing_high - ema1h) / max(1e-12, ema1h) * 100.0) <= cfg.short_max_pullback_pct
+        ):
+            swing_sl = swing_high + swing_buf
+            atr_sl = px + sl_off
+            sl = max(swing_sl, atr_sl)
+            if sl <= px:
+                return None
+            risk = sl - px
+            tp1 = px - float(cfg.tp1_rr) * risk
+            tp2 = px - float(cfg.tp2_rr) * risk
+            tp = px - cfg.rr * risk
+            self._cooldown = max(0, int(cfg.cooldown_bars_5m))
+            self._day_signals += 1
+            sig = TradeSignal(
+                strategy="btc_eth_midterm_pullback",
+                symbol=store.symbol,
+                side="short",
+                entry=px,
+                sl=float(sl),
+                tp=float(tp),
+                reason=f"mtpb_short trend4h pullback1h ema={cfg.signal_ema_period}",
+            )
+            if cfg.use_runner_exits:
+                tp1_frac = min(0.9, max(0.1, float(cfg.tp1_frac)))
+                sig.tps = [float(tp1), float(tp2)]
+                sig.tp_fracs = [tp1_frac, max(0.0, 1.0 - tp1_frac)]
+                sig.trailing_atr_mult = max(0.0, float(cfg.trail_atr_mult))
+                sig.trailing_atr_period = max(5, int(cfg.atr_period))
+                sig.time_stop_bars = max(0, int(cfg.time_stop_bars_5m))
+            return sig
+        return None
 
     def maybe_signal(self, store, ts_ms: int, o: float, h: float, l: float, c: float, v: float = 0.0) -> Optional[TradeSignal]:
         _ = (o, h, l, v)
-        sym = str(getattr(store, "symbol", "")).upper()
-        if self._allow and sym not in self._allow:
-            return None
-        if sym in self._deny:
+        raw_sym = getattr(store, "symbol", "")
+        denied = self._denied_fast.get(raw_sym)
+        if denied is None:
+            sym = str(raw_sym).upper()
+            denied = bool(self._allow and sym not in self._allow) or sym in self._deny
+            self._denied_fast[raw_sym] = denied
+        if denied:
             return None
 
         if self._cooldown > 0:
             self._cooldown -= 1
             return None
+        cfg = self.cfg
 
         ts_sec = int(ts_ms // 1000 if ts_ms > 10_000_000_000 else ts_ms)
         day_key = ts_sec // 86400
         if self._day_key != day_key:
             self._day_key = day_key
             self._day_signals = 0
-        if self._day_signals >= self.cfg.max_signals_per_day:
+        if self._day_signals >= cfg.max_signals_per_day:
             return None
 
-        bucket = ts_sec // max(1, int(self.cfg.eval_tf_min * 60))
+        bucket = ts_sec // max(1, int(cfg.eval_tf_min * 60))
         if self._last_eval_bucket == bucket:
             return None
         self._last_eval_bucket = bucket
 
-        bias = self._trend_bias(store)
-        if bias is None or bias == 1:
+        need_1h = max(cfg.signal_ema_period + cfg.swing_lookback_bars + 5, 90)
+        arr_1h = klines_array(store, cfg.signal_tf, need_1h)
+        n_1h = arr_1h.shape[0]
+        if n_1h < cfg.signal_ema_period + cfg.swing_lookback_bars + 2:
             return None
 
-        need_1h = max(self.cfg.signal_ema_period + self.cfg.swing_lookback_bars + 5, 90)
-        rows_1h = store.fetch_klines(store.symbol, self.cfg.signal_tf, need_1h) or []
-        if len(rows_1h) < self.cfg.signal_ema_period + self.cfg.swing_lookback_bars + 2:
+        closes = arr_1h[:, 3]
+        ema1h = klines_ema(arr_1h, cfg.signal_ema_period)
+        atr1h = klines_atr(arr_1h, cfg.atr_period)
+        if ema1h != ema1h or not (atr1h > 0.0):  # NaN guards without math.isfinite calls
             return None
-
-        highs = [float(r[2]) for r in rows_1h]
-        lows = [float(r[3]) for r in rows_1h]
-        closes = [float(r[4]) for r in rows_1h]
-        ema1h = _ema(closes, self.cfg.signal_ema_period)
-        atr1h = _atr_from_rows(rows_1h, self.cfg.atr_period)
-        if not (math.isfinite(ema1h) and math.isfinite(atr1h) and atr1h > 0):
-            return None
-        cur_c = closes[-1]
+        cur_c = float(closes[-1])
         atr_pct_1h = (atr1h / max(1e-12, abs(cur_c))) * 100.0
-        max_atr_pct = max(
-            float(self.cfg.long_max_atr_pct_1h),
-            float(self.cfg.short_max_atr_pct_1h),
-        )
-        if atr_pct_1h > max_atr_pct:
+        if atr_pct_1h > self._max_atr_pct:
             return None
 
-        prev_c = closes[-2]
-        look = max(3, min(len(rows_1h), int(self.cfg.swing_lookback_bars)))
-        swing_low = min(lows[-look:])
-        swing_high = max(highs[-look:])
-
-        # Long: 4h uptrend + 1h pullback to EMA20 + reclaim.
-        if self.cfg.allow_longs and bias == 2:
-            if atr_pct_1h > float(self.cfg.long_max_atr_pct_1h):
-                return None
-            touched = swing_low <= ema1h * (1.0 + self.cfg.long_touch_tol_pct / 100.0)
-            reclaimed = (cur_c >= ema1h * (1.0 + self.cfg.long_reclaim_pct / 100.0)) and (prev_c <= ema1h * 1.003)
-            pullback_pct = max(0.0, (ema1h - swing_low) / max(1e-12, ema1h) * 100.0)
-            if touched and reclaimed and pullback_pct <= self.cfg.long_max_pullback_pct:
-                swing_sl = swing_low - self.cfg.swing_sl_buffer_atr * atr1h
-                atr_sl = float(c) - self.cfg.sl_atr_mult * atr1h
-                sl = min(swing_sl, atr_sl)
-                if sl >= float(c):
-                    return None
-                risk = float(c) - sl
-                tp1 = float(c) + float(self.cfg.tp1_rr) * risk
-                tp2 = float(c) + float(self.cfg.tp2_rr) * risk
-                tp = float(c) + self.cfg.rr * risk
-                self._cooldown = max(0, int(self.cfg.cooldown_bars_5m))
-                self._day_signals += 1
-                sig = TradeSignal(
-                    strategy="btc_eth_midterm_pullback",
-                    symbol=store.symbol,
-                    side="long",
-                    entry=float(c),
-                    sl=float(sl),
-                    tp=float(tp),
-                    reason=f"mtpb_long trend4h pullback1h ema={self.cfg.signal_ema_period}",
-                )
-                if self.cfg.use_runner_exits:
-                    tp1_frac = min(0.9, max(0.1, float(self.cfg.tp1_frac)))
-                    sig.tps = [float(tp1), float(tp2)]
-                    sig.tp_fracs = [tp1_frac, max(0.0, 1.0 - tp1_frac)]
-                    sig.trailing_atr_mult = max(0.0, float(self.cfg.trail_atr_mult))
-                    sig.trailing_atr_period = max(5, int(self.cfg.atr_period))
-                    sig.time_stop_bars = max(0, int(self.cfg.time_stop_bars_5m))
-                return sig
-
-        # Short: 4h downtrend + 1h pullback to EMA20 + reclaim below EMA.
-        if self.cfg.allow_shorts and bias == 0:
-            if atr_pct_1h > float(self.cfg.short_max_atr_pct_1h):
-                return None
-            touched = swing_high >= ema1h * (1.0 - self.cfg.short_touch_tol_pct / 100.0)
-            reclaimed = (cur_c <= ema1h * (1.0 - self.cfg.short_reclaim_pct / 100.0)) and (prev_c >= ema1h * 0.997)
-            pullback_pct = max(0.0, (swing_high - ema1h) / max(1e-12, ema1h) * 100.0)
-            if touched and reclaimed and pullback_pct <= self.cfg.short_max_pullback_pct:
-                swing_sl = swing_high + self.cfg.swing_sl_buffer_atr * atr1h
-                atr_sl = float(c) + self.cfg.sl_atr_mult * atr1h
-                sl = max(swing_sl, atr_sl)
-                if sl <= float(c):
-                    return None
-                risk = sl - float(c)
-                tp1 = float(c) - float(self.cfg.tp1_rr) * risk
-                tp2 = float(c) - float(self.cfg.tp2_rr) * risk
-                tp = float(c) - self.cfg.rr * risk
-                self._cooldown = max(0, int(self.cfg.cooldown_bars_5m))
-                self._day_signals += 1
-                sig = TradeSignal(
-                    strategy="btc_eth_midterm_pullback",
-                    symbol=store.symbol,
-                    side="short",
-                    entry=float(c),
-                    sl=float(sl),
-                    tp=float(tp),
-                    reason=f"mtpb_short trend4h pullback1h ema={self.cfg.signal_ema_period}",
-                )
-                if self.cfg.use_runner_exits:
-                    tp1_frac = min(0.9, max(0.1, float(self.cfg.tp1_frac)))
-                    sig.tps = [float(tp1), float(tp2)]
-                    sig.tp_fracs = [tp1_frac, max(0.0, 1.0 - tp1_frac)]
-                    sig.trailing_atr_mult = max(0.0, float(self.cfg.trail_atr_mult))
-                    sig.trailing_atr_period = max(5, int(self.cfg.atr_period))
-                    sig.time_stop_bars = max(0, int(self.cfg.time_stop_bars_5m))
-                return sig
-
-        return None
+        # 4h bias last: its window is ~3x the 1h one, so cheap 1h rejects skip that fetch.
+        bias = self._trend_bias(store)
+        handler = self._handlers.get(bias)
+        if handler is None:
+            return None
+        return handler(store, float(c), ema1h, atr1h, atr_pct_1h, arr_1h)
@@ -1,81 +1,32 @@
 from __future__ import annotations
 
 import os
-import inspect
-import math
-import asyncio
+import sys
 from dataclasses import dataclass
-from typing import Optional, Any, Dict, List
+from typing import Optional, Any, FrozenSet
 
 from backtest.bt_types import TradeSignal
 from sr_inplay_retest import InPlayBreakoutStrategy
 
+from ._engine_klines import engine_kline_fetcher
+from ._engine_kwargs import coerce_config_fields, engine_kwargs
+from ._env_utils import _env_bool, _env_csv_floats, _env_float, _env_int, _env_str, store_symbol_upper
+from ._indicators import breakout_guard_ok, breakout_ref_ok
+from ._sync_bridge import await_sync
 
-def _run_coro_sync(obj: Any) -> Any:
-    if asyncio.iscoroutine(obj):
-        try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                new_loop = asyncio.new_event_loop()
-                try:
-                    return new_loop.run_until_complete(obj)
-                finally:
-                    new_loop.close()
-            return loop.run_until_complete(obj)
-        except RuntimeError:
-            return asyncio.run(obj)
-    return obj
-
-
-def _env_bool(name: str, default: bool) -> bool:
-    v = os.getenv(name)
-    if v is None:
-        return default
-    return v.strip().lower() in {"1", "true", "yes", "on"}
-
-
-def _env_int(name: str, default: int) -> int:
-    v = os.getenv(name)
-    if v is None or not v.strip():
-        return default
-    try:
-        return int(v.strip())
-    except Exception:
-        return default
-
-
-def _env_float(name: str, default: float) -> float:
-    v = os.getenv(name)
-    if v is None or not v.strip():
-        return default
-    try:
-        return float(v.strip())
-    except Exception:
-        return default
-
-
-def _env_csv_floats(name: str, default: List[float]) -> List[float]:
-    v = os.getenv(name)
-    if v is None or not v.strip():
-        return list(default)
-    parts = [p.strip() for p in v.replace(';', ',').split(',')]
-    out: List[float] = []
-    for p in parts:
-        if not p:
-            continue
-        try:
-            out.append(float(p))
-        except Exception:
-            pass
-    return out if out else list(default)
 
-
-def _env_csv_set(name: str) -> set[str]:
+# Not memoised: {prefix}_SYMBOL_ALLOWLIST/_DENYLIST are dynamic (bot/allowlist_watcher.py
+# rewrites BREAKDOWN_SYMBOL_ALLOWLIST at runtime), so each new wrapper reads them afresh.
+def _env_csv_set(name: str) -> FrozenSet[str]:
     raw = os.getenv(name, "") or ""
-    return {p.strip().upper() for p in raw.split(",") if p.strip()}
+    return frozenset(sys.intern(p.strip().upper()) for p in raw.split(",") if p.strip())
+
 
+# Long-form dict keys tried by `_bar_value` when the short one is missing.
+_BAR_ALT_KEYS = {"h": "high", "l": "low", "c": "close"}
 
-@dataclass
+
+@dataclass(slots=True)
 class InPlayBreakoutConfig:
     tf_break: str = "240"
     tf_entry: str = "5"
@@ -111,62 +62,126 @@ class InPlayBreakoutConfig:
     chop_er_period: int = 20
     chop_in_range_only: bool = True
 
+    def __post_init__(self) -> None:
+        coerce_config_fields(self)
+
+
+@dataclass(slots=True, frozen=True)
+class _RuntimeParams:
+    """Per-signal {prefix}_* knobs, parsed once: env does not change mid-process."""
+
+    max_late_pct: float
+    min_pullback_pct: float
+    ref_lookback: int
+    min_stop_pct: float
+    max_stop_pct: float
+    runner_exit: bool  # {prefix}_EXIT_MODE is runner/managed
+    partial_rs: tuple[float, ...]
+    partial_fracs: tuple[float, ...]  # one per partial_rs entry (equal split if the env lengths differ)
+    trail_mult: float
+    trail_period: int
+    time_stop: int
+
+    @classmethod
+    def from_env(cls, p: str) -> "_RuntimeParams":
+        rs = _env_csv_floats(f"{p}_PARTIAL_RS", (1.0, 2.0, 3.5))
+        fracs = _env_csv_floats(f"{p}_PARTIAL_FRACS", (0.50, 0.25, 0.15))
+        if len(fracs) != len(rs):
+            fracs = (1.0 / len(rs),) * len(rs)
+        return cls(
+            max_late_pct=_env_float(f"{p}_MAX_LATE_VS_REF_PCT", 0.0),
+            min_pullback_pct=_env_float(f"{p}_MIN_PULLBACK_FROM_EXTREME_PCT", 0.0),
+            ref_lookback=max(5, _env_int(f"{p}_REF_LOOKBACK_BARS", 20)),
+            min_stop_pct=_env_float(f"{p}_MIN_STOP_PCT", 0.0),
+            max_stop_pct=_env_float(f"{p}_MAX_STOP_PCT", 0.0),
+            runner_exit=(_env_str(f"{p}_EXIT_MODE") or "fixed").strip().lower() in ("runner", "managed"),
+            partial_rs=rs,
+            partial_fracs=fracs,
+            trail_mult=_env_float(f"{p}_TRAIL_ATR_MULT", 2.2),
+            trail_period=_env_int(f"{p}_TRAIL_ATR_PERIOD", 14),
+            time_stop=_env_int(f"{p}_TIME_STOP_BARS", 288),
+        )
+
+
+# ({prefix}_ suffix, config attr, reader) for the plain config overrides; the
+# {prefix}_REGIME switch and the two int(... or default) fields are handled in __init__.
+_CFG_ENV = (
+    ("TF_BREAK", "tf_break", _env_str),
+    ("TF_ENTRY", "tf_entry", _env_str),
+    ("LOOKBACK_H", "lookback_h", _env_int),
+    ("ATR_PERIOD", "atr_period", _env_int),
+    ("IMPULSE_ATR_MULT", "impulse_atr_mult", _env_float),
+    ("IMPULSE_BODY_MIN_FRAC", "impulse_body_min_frac", _env_float),
+    ("IMPULSE_VOL_MULT", "impulse_vol_mult", _env_float),
+    ("IMPULSE_VOL_PERIOD", "impulse_vol_period", _env_int),
+    ("BUFFER_ATR", "breakout_buffer_atr", _env_float),
+    ("SL_ATR", "breakout_sl_atr", _env_float),
+    ("RETEST_TOUCH_ATR", "retest_touch_atr", _env_float),
+    ("RECLAIM_ATR", "reclaim_atr", _env_float),
+    ("MIN_HOLD_BARS", "min_hold_bars", _env_int),
+    ("MAX_RETEST_BARS", "max_retest_bars", _env_int),
+    ("MIN_BREAK_BARS", "min_break_bars", _env_int),
+    ("MAX_DIST_ATR", "max_dist_atr", _env_float),
+    ("RR", "rr", _env_float),
+    ("RANGE_ATR_MAX", "range_atr_max", _env_float),
+    ("ALLOW_LONGS", "allow_longs", _env_bool),
+    ("ALLOW_SHORTS", "allow_shorts", _env_bool),
+    ("REGIME_MODE", "regime_mode", _env_str),
+    ("REGIME_TF", "regime_tf", _env_str),
+    ("REGIME_EMA_FAST", "regime_ema_fast", _env_int),
+    ("REGIME_EMA_SLOW", "regime_ema_slow", _env_int),
+    ("REGIME_MIN_GAP_ATR", "regime_min_gap_atr", _env_float),
+    ("REGIME_STRICT", "regime_strict", _env_bool),
+    ("REGIME_PRICE_FILTER", "regime_price_filter", _env_bool),
+    ("CHOP_ER_MIN", "chop_er_min", _env_float),
+    ("CHOP_IN_RANGE_ONLY", "chop_in_range_only", _env_bool),
+)
+
 
 class InPlayBreakoutWrapper:
+    __slots__ = (
+        "cfg",
+        "_prefix",
+        "_allow",
+        "_deny",
+        "_has_allow",
+        "_has_deny",
+        "last_no_signal_reason",
+        "_rt",
+        "impl",
+    )
+
     def __init__(self, cfg: Optional[InPlayBreakoutConfig] = None, env_prefix: str = "BREAKOUT"):
         self.cfg = cfg or InPlayBreakoutConfig()
         p = env_prefix  # short alias for readability
         self._prefix = p  # stored for use in instance methods
         self._allow = _env_csv_set(f"{p}_SYMBOL_ALLOWLIST")
         self._deny = _env_csv_set(f"{p}_SYMBOL_DENYLIST")
+        self._has_allow = bool(self._allow)
+        self._has_deny = bool(self._deny)
         self.last_no_signal_reason: str = ""
 
-        self.cfg.tf_break = os.getenv(f"{p}_TF_BREAK", self.cfg.tf_break)
-        self.cfg.tf_entry = os.getenv(f"{p}_TF_ENTRY", self.cfg.tf_entry)
-        self.cfg.lookback_h = _env_int(f"{p}_LOOKBACK_H", self.cfg.lookback_h)
-        self.cfg.atr_period = _env_int(f"{p}_ATR_PERIOD", self.cfg.atr_period)
-        self.cfg.impulse_atr_mult = _env_float(f"{p}_IMPULSE_ATR_MULT", self.cfg.impulse_atr_mult)
-        self.cfg.impulse_body_min_frac = _env_float(f"{p}_IMPULSE_BODY_MIN_FRAC", self.cfg.impulse_body_min_frac)
-        self.cfg.impulse_vol_mult = _env_float(f"{p}_IMPULSE_VOL_MULT", self.cfg.impulse_vol_mult)
-        self.cfg.impulse_vol_period = _env_int(f"{p}_IMPULSE_VOL_PERIOD", self.cfg.impulse_vol_period)
-        self.cfg.breakout_buffer_atr = _env_float(f"{p}_BUFFER_ATR", self.cfg.breakout_buffer_atr)
-        self.cfg.breakout_sl_atr = _env_float(f"{p}_SL_ATR", self.cfg.breakout_sl_atr)
-        self.cfg.retest_touch_atr = _env_float(f"{p}_RETEST_TOUCH_ATR", self.cfg.retest_touch_atr)
-        self.cfg.reclaim_atr = _env_float(f"{p}_RECLAIM_ATR", self.cfg.reclaim_atr)
-        self.cfg.min_hold_bars = _env_int(f"{p}_MIN_HOLD_BARS", self.cfg.min_hold_bars)
-        self.cfg.max_retest_bars = _env_int(f"{p}_MAX_RETEST_BARS", self.cfg.max_retest_bars)
-        self.cfg.min_break_bars = _env_int(f"{p}_MIN_BREAK_BARS", self.cfg.min_break_bars)
-        self.cfg.max_dist_atr = _env_float(f"{p}_MAX_DIST_ATR", self.cfg.max_dist_atr)
-        self.cfg.rr = _env_float(f"{p}_RR", self.cfg.rr)
-        self.cfg.range_atr_max = _env_float(f"{p}_RANGE_ATR_MAX", self.cfg.range_atr_max)
-
-        self.cfg.allow_longs = _env_bool(f"{p}_ALLOW_LONGS", self.cfg.allow_longs)
-        self.cfg.allow_shorts = _env_bool(f"{p}_ALLOW_SHORTS", self.cfg.allow_shorts)
-
-        self.cfg.regime_mode = os.getenv(f"{p}_REGIME_MODE", self.cfg.regime_mode)
-        if str(os.getenv(f'{p}_REGIME', '')).strip().lower() in ('1','true','yes','on'):
-            if str(self.cfg.regime_mode).strip().lower() in ('off','0','false','none',''):
-                self.cfg.regime_mode = 'ema'
-        self.cfg.regime_tf = os.getenv(f"{p}_REGIME_TF", self.cfg.regime_tf)
-        self.cfg.regime_ema_fast = _env_int(f"{p}_REGIME_EMA_FAST", self.cfg.regime_ema_fast)
-        self.cfg.regime_ema_slow = _env_int(f"{p}_REGIME_EMA_SLOW", self.cfg.regime_ema_slow)
-        self.cfg.regime_min_gap_atr = _env_float(f"{p}_REGIME_MIN_GAP_ATR", self.cfg.regime_min_gap_atr)
-        self.cfg.regime_strict = _env_bool(f"{p}_REGIME_STRICT", self.cfg.regime_strict)
-        self.cfg.regime_price_filter = _env_bool(f"{p}_REGIME_PRICE_FILTER", self.cfg.regime_price_filter)
-        self.cfg.regime_cache_sec = int(os.getenv(f"{p}_REGIME_CACHE_SEC", str(self.cfg.regime_cache_sec)) or self.cfg.regime_cache_sec)
-        self.cfg.chop_er_min = _env_float(f"{p}_CHOP_ER_MIN", self.cfg.chop_er_min)
-        self.cfg.chop_er_period = int(os.getenv(f"{p}_CHOP_ER_PERIOD", str(self.cfg.chop_er_period)) or self.cfg.chop_er_period)
-        self.cfg.chop_in_range_only = _env_bool(f"{p}_CHOP_IN_RANGE_ONLY", self.cfg.chop_in_range_only)
+        cfg = self.cfg
+        for suffix, attr, read in _CFG_ENV:
+            setattr(cfg, attr, read(f"{p}_{suffix}", getattr(cfg, attr)))
+
+        if str(_env_str(f'{p}_REGIME', '')).strip().lower() in ('1','true','yes','on'):
+            if str(cfg.regime_mode).strip().lower() in ('off','0','false','none',''):
+                cfg.regime_mode = 'ema'
+        cfg.regime_cache_sec = int(_env_str(f"{p}_REGIME_CACHE_SEC", str(cfg.regime_cache_sec)) or cfg.regime_cache_sec)
+        cfg.chop_er_period = int(_env_str(f"{p}_CHOP_ER_PERIOD", str(cfg.chop_er_period)) or cfg.chop_er_period)
 
+        self._rt = _RuntimeParams.from_env(p)
         self.impl: Optional[InPlayBreakoutStrategy] = None
 
     @staticmethod
     def _bar_value(bar: Any, key: str) -> Optional[float]:
         if isinstance(bar, dict):
             v = bar.get(key)
-            if v is None and key in {"h", "l", "c"}:
-                alt = {"h": "high", "l": "low", "c": "close"}[key]
-                v = bar.get(alt)
+            if v is None:
+                alt = _BAR_ALT_KEYS.get(key)
+                if alt is not None:
+                    v = bar.get(alt)
             try:
                 return float(v) if v is not None else None
             except Exception:
@@ -177,9 +192,9 @@ class InPlayBreakoutWrapper:
             return None
 
     def _passes_entry_timing_guards(self, store: Any, side: str, entry: float) -> bool:
-        p = getattr(self, "_prefix", "BREAKOUT")
-        max_late_pct = _env_float(f"{p}_MAX_LATE_VS_REF_PCT", 0.0)
-        min_pullback_pct = _env_float(f"{p}_MIN_PULLBACK_FROM_EXTREME_PCT", 0.0)
+        rt = self._rt
+        max_late_pct = rt.max_late_pct
+        min_pullback_pct = rt.min_pullback_pct
         if max_late_pct <= 0 and min_pullback_pct <= 0:
             return True
 
@@ -191,163 +206,66 @@ class InPlayBreakoutWrapper:
         if i <= 2:
             return True
 
-        lookback = max(5, _env_int(f"{p}_REF_LOOKBACK_BARS", 20))
-        lo = max(0, i - lookback)
-        seg = list(bars[lo:i])
-        if len(seg) < 3:
+        lo = max(0, i - rt.ref_lookback)
+        hi = min(i, len(bars))
+        if hi - lo < 3:
             return True
 
-        highs = [self._bar_value(b, "h") for b in seg]
-        lows = [self._bar_value(b, "l") for b in seg]
-        highs = [x for x in highs if x is not None]
-        lows = [x for x in lows if x is not None]
-        if not highs or not lows:
+        is_long = side == "long"
+        highs = getattr(store, "c5_high_np", None)
+        lows = getattr(store, "c5_low_np", None)
+        if highs is not None and lows is not None and len(highs) == len(bars):
+            # Column arrays kept by the store: scan + checks in one compiled kernel.
+            return breakout_guard_ok(highs, lows, lo, hi, is_long, entry, max_late_pct, min_pullback_pct)
+
+        # One pass for both extremes (same picks as max()/min()), no temporary lists.
+        max_high: Optional[float] = None
+        min_low: Optional[float] = None
+        for b in bars[lo:hi]:
+            h = self._bar_value(b, "h")
+            if h is not None and (max_high is None or h > max_high):
+                max_high = h
+            l = self._bar_value(b, "l")
+            if l is not None and (min_low is None or l < min_low):
+                min_low = l
+        if max_high is None or min_low is None:
             return True
-
-        if side == "long":
-            brk_ref = max(highs)
-            if max_late_pct > 0 and brk_ref > 0:
-                late_pct = ((entry / brk_ref) - 1.0) * 100.0
-                if late_pct > max_late_pct:
-                    return False
-            if min_pullback_pct > 0 and brk_ref > 0:
-                pb_pct = ((brk_ref - entry) / brk_ref) * 100.0
-                if pb_pct < min_pullback_pct:
-                    return False
-            return True
-
-        brk_ref = min(lows)
-        if max_late_pct > 0 and brk_ref > 0:
-            late_pct = ((brk_ref / entry) - 1.0) * 100.0
-            if late_pct > max_late_pct:
-                return False
-        if min_pullback_pct > 0 and brk_ref > 0:
-            bounce_pct = ((entry - brk_ref) / brk_ref) * 100.0
-            if bounce_pct < min_pullback_pct:
-                return False
-        return True
-
-    @staticmethod
-    def _hours_to_break_bars(lookback_h: int, tf_break: str) -> int:
-        try:
-            minutes = int(tf_break)
-            if minutes <= 0:
-                raise ValueError
-        except Exception:
-            minutes = 60
-        bars = int(math.ceil((lookback_h * 60) / minutes))
-        return max(10, bars)
+        brk_ref = max_high if is_long else min_low
+        return breakout_ref_ok(brk_ref, is_long, entry, max_late_pct, min_pullback_pct)
 
     def _ensure_impl(self, store) -> None:
         if self.impl is not None:
             return
 
-        tf_break = self.cfg.tf_break
-        lookback_break_bars = self._hours_to_break_bars(self.cfg.lookback_h, tf_break)
-
-        def _fetch_klines(symbol: str, interval: str, limit: int):
-            raw = store.fetch_klines(symbol, interval, int(limit))
-            out: List[Dict[str, Any]] = []
-            for r in (raw or []):
-                if isinstance(r, dict):
-                    o = r.get("open", r.get("o"))
-                    h = r.get("high", r.get("h"))
-                    l = r.get("low", r.get("l"))
-                    c = r.get("close", r.get("c"))
-                    ts = r.get("startTime", r.get("ts", r.get("t")))
-                    v = r.get("volume", r.get("v", 0.0))
-                    out.append({
-                        "startTime": ts,
-                        "open": float(o),
-                        "high": float(h),
-                        "low": float(l),
-                        "close": float(c),
-                        "volume": float(v) if v is not None else 0.0,
-                    })
-                    continue
-
-                if hasattr(r, "o") and hasattr(r, "h") and hasattr(r, "l") and hasattr(r, "c"):
-                    ts = getattr(r, "ts", getattr(r, "t", None))
-                    v = getattr(r, "v", 0.0)
-                    out.append({
-                        "startTime": ts,
-                        "open": float(getattr(r, "o")),
-                        "high": float(getattr(r, "h")),
-                        "low": float(getattr(r, "l")),
-                        "close": float(getattr(r, "c")),
-                        "volume": float(v) if v is not None else 0.0,
-                    })
-                    continue
-
-                if isinstance(r, (list, tuple)) and len(r) >= 5:
-                    ts, o, h, l, c = r[0], r[1], r[2], r[3], r[4]
-                    v = r[5] if len(r) > 5 else 0.0
-                    out.append({
-                        "startTime": ts,
-                        "open": float(o),
-                        "high": float(h),
-                        "low": float(l),
-                        "close": float(c),
-                        "volume": float(v) if v is not None else 0.0,
-                    })
-                    continue
-            return out
-
-        candidate: Dict[str, Any] = {
-            "tf_break": tf_break,
-            "lookback_break_bars": int(lookback_break_bars),
-            "atr_period": int(self.cfg.atr_period),
-            "impulse_atr_mult": float(self.cfg.impulse_atr_mult),
-            "impulse_body_min_frac": float(self.cfg.impulse_body_min_frac),
-            "impulse_vol_mult": float(self.cfg.impulse_vol_mult),
-            "impulse_vol_period": int(self.cfg.impulse_vol_period),
-            "breakout_buffer_atr": float(self.cfg.breakout_buffer_atr),
-            "breakout_sl_atr": float(self.cfg.breakout_sl_atr),
-            "tf_entry": str(self.cfg.tf_entry),
-            "retest_touch_atr": float(self.cfg.retest_touch_atr),
-            "reclaim_atr": float(self.cfg.reclaim_atr),
-            "min_hold_bars": int(self.cfg.min_hold_bars),
-            "max_retest_bars": int(self.cfg.max_retest_bars),
-            "min_break_bars": int(self.cfg.min_break_bars),
-            "max_dist_atr": float(self.cfg.max_dist_atr),
-            "rr": float(self.cfg.rr),
-            "range_atr_max": float(self.cfg.range_atr_max),
-            "allow_longs": bool(self.cfg.allow_longs),
-            "allow_shorts": bool(self.cfg.allow_shorts),
-            "regime_mode": str(self.cfg.regime_mode),
-            "regime_tf": str(self.cfg.regime_tf),
-            "regime_ema_fast": int(self.cfg.regime_ema_fast),
-            "regime_ema_slow": int(self.cfg.regime_ema_slow),
-            "regime_min_gap_atr": float(self.cfg.regime_min_gap_atr),
-            "regime_strict": bool(self.cfg.regime_strict),
-            "regime_price_filter": bool(self.cfg.regime_price_filter),
-            "regime_cache_sec": int(self.cfg.regime_cache_sec),
-            "chop_er_min": float(self.cfg.chop_er_min),
-            "chop_er_period": int(self.cfg.chop_er_period),
-            "chop_in_range_only": bool(self.cfg.chop_in_range_only),
-        }
-
-        sig = inspect.signature(InPlayBreakoutStrategy.__init__)
-        accepted = set(sig.parameters.keys()) - {"self", "fetch_klines"}
-        filtered = {k: v for k, v in candidate.items() if k in accepted}
-
-        self.impl = InPlayBreakoutStrategy(_fetch_klines, **filtered)
+        self.impl = InPlayBreakoutStrategy(engine_kline_fetcher(store), **engine_kwargs(InPlayBreakoutStrategy, self.cfg))
+
+    def _symbol_filtered(self, store) -> bool:
+        """True (with last_no_signal_reason set) when the allow/deny lists exclude store.symbol."""
+        if not (self._has_allow or self._has_deny):
+            return False
+        sym_u = store_symbol_upper(store)
+        if self._has_allow and sym_u not in self._allow:
+            self.last_no_signal_reason = "symbol_not_allowed"
+            return True
+        if sym_u in self._deny:
+            self.last_no_signal_reason = "symbol_denied"
+            return True
+        return False
 
     def signal(self, store, ts_ms: int, last_price: float) -> Optional[TradeSignal]:
-        return _run_coro_sync(self.maybe_signal(store, ts_ms, last_price))
+        # Filtered symbols return before a coroutine or event loop is involved.
+        if self._symbol_filtered(store):
+            return None
+        return await_sync(self.maybe_signal(store, ts_ms, last_price))
 
     async def maybe_signal(self, store, ts_ms: int, last_price: float) -> Optional[TradeSignal]:
-        self._ensure_impl(store)
-        assert self.impl is not None
+        # Symbol filter first: filtered symbols never build or run the engine.
+        if self._symbol_filtered(store):
+            return None
 
         symbol = store.symbol
-        sym_u = str(symbol or "").upper()
-        if self._allow and sym_u not in self._allow:
-            self.last_no_signal_reason = "symbol_not_allowed"
-            return None
-        if sym_u in self._deny:
-            self.last_no_signal_reason = "symbol_denied"
-            return None
+        self._ensure_impl(store)
+        assert self.impl is not None
         sig = await self.impl.maybe_signal(symbol, price=float(last_price), ts_ms=int(ts_ms))
         if not sig:
             self.last_no_signal_reason = str(getattr(self.impl, "last_no_signal_reason", "") or "engine_no_signal")
@@ -362,9 +280,9 @@ class InPlayBreakoutWrapper:
             self.last_no_signal_reason = "entry_timing_guard"
             return None
 
-        p = getattr(self, "_prefix", "BREAKOUT")
-        min_stop_pct = _env_float(f'{p}_MIN_STOP_PCT', 0.0)
-        max_stop_pct = _env_float(f'{p}_MAX_STOP_PCT', 0.0)
+        rt = self._rt
+        min_stop_pct = rt.min_stop_pct
+        max_stop_pct = rt.max_stop_pct
         stop_pct = abs(entry - sl) / max(1e-12, entry)
         if min_stop_pct > 0 and stop_pct < min_stop_pct:
             self.last_no_signal_reason = "stop_too_tight"
@@ -375,23 +293,13 @@ class InPlayBreakoutWrapper:
 
         base_reason = getattr(sig, "reason", "breakout")
 
-        exit_mode = (os.getenv(f"{p}_EXIT_MODE") or "fixed").strip().lower()
-        if exit_mode in {"runner", "managed"}:
+        if rt.runner_exit:
             risk = abs(entry - sl)
             if risk > 0:
-                rs = _env_csv_floats(f"{p}_PARTIAL_RS", [1.0, 2.0, 3.5])
-                fracs = _env_csv_floats(f"{p}_PARTIAL_FRACS", [0.50, 0.25, 0.15])
-                if len(fracs) != len(rs):
-                    fracs = [1.0 / len(rs)] * len(rs)
-
                 if side == "long":
-                    tps = [entry + (r * risk) for r in rs]
+                    tps = [entry + (r * risk) for r in rt.partial_rs]
                 else:
-                    tps = [entry - (r * risk) for r in rs]
-
-                trail_mult = _env_float(f"{p}_TRAIL_ATR_MULT", 2.2)
-                trail_period = _env_int(f"{p}_TRAIL_ATR_PERIOD", 14)
-                time_stop = _env_int(f"{p}_TIME_STOP_BARS", 288)
+                    tps = [entry - (r * risk) for r in rt.partial_rs]
 
                 return TradeSignal(
                     strategy="inplay_breakout",
@@ -401,10 +309,10 @@ class InPlayBreakoutWrapper:
                     sl=sl,
                     tp=float(tps[-1]),
                     tps=tps,
-                    tp_fracs=fracs,
-                    trailing_atr_mult=trail_mult,
-                    trailing_atr_period=trail_period,
-                    time_stop_bars=time_stop,
+                    tp_fracs=list(rt.partial_fracs),
+                    trailing_atr_mult=rt.trail_mult,
+                    trailing_atr_period=rt.trail_period,
+                    time_stop_bars=rt.time_stop,
                     reason=(base_reason + ";runner"),
                 )
 
@@ -45,6 +45,18 @@ class TradeSignal:
     # Free-form text tag for debugging/reporting.
     reason: str = ""
 
+    @staticmethod
+    def levels_ok(side: str, entry: float, sl: float, tp: float) -> bool:
+        """Side/price checks of validate() on raw numbers (no tps, default BE settings).
+
+        Lets strategies reject a setup before building the signal and its reason string.
+        """
+        if side == "long":
+            return 0 < sl < entry < tp
+        if side == "short":
+            return 0 < tp < entry < sl
+        return False
+
     def validate(self) -> bool:
         if self.side not in ("long", "short"):
             return False
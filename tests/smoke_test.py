@@ -312,6 +312,123 @@ def test_diagnostics_snapshot():
     print("  ✓ diagnostics._runtime_diag_snapshot — histogram + news keys present")
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# 9. strategies/btc_eth_midterm_pullback — cached MTPB_* env snapshot
+# ─────────────────────────────────────────────────────────────────────────────
+def test_midterm_env_snapshot():
+    from strategies._env_utils import _reset_env_cache
+    from strategies.btc_eth_midterm_pullback import BTCETHMidtermPullbackStrategy
+
+    keys = ("MTPB_TOUCH_TOL_PCT", "MTPB_SHORT_TOUCH_TOL_PCT", "MTPB_RR", "MTPB_ALLOW_LONGS")
+    saved = {k: os.environ.get(k) for k in keys}
+    try:
+        os.environ["MTPB_TOUCH_TOL_PCT"] = "0.5"
+        os.environ["MTPB_SHORT_TOUCH_TOL_PCT"] = " 0.1 "
+        os.environ["MTPB_RR"] = "bad"
+        os.environ["MTPB_ALLOW_LONGS"] = "no"
+        _reset_env_cache()
+        cfg = BTCETHMidtermPullbackStrategy().cfg
+        assert cfg.touch_tol_pct == 0.5
+        assert cfg.long_touch_tol_pct == 0.5, "unset side knob inherits shared value"
+        assert cfg.short_touch_tol_pct == 0.1
+        assert cfg.rr == 2.2, "invalid float falls back to default"
+        assert cfg.allow_longs is False
+
+        # Snapshot is cached until reset
+        os.environ["MTPB_TOUCH_TOL_PCT"] = "0.9"
+        assert BTCETHMidtermPullbackStrategy().cfg.touch_tol_pct == 0.5
+        _reset_env_cache()
+        assert BTCETHMidtermPullbackStrategy().cfg.touch_tol_pct == 0.9
+    finally:
+        for k, v in saved.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+        _reset_env_cache()
+
+    print("  ✓ btc_eth_midterm_pullback MTPB_* env snapshot — parse, side defaults, reset")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 10. strategies/_indicators — eager kernels, RSI pair parity
+# ─────────────────────────────────────────────────────────────────────────────
+def test_indicator_kernels():
+    import numpy as np
+    from strategies import _indicators as ind
+
+    if ind.HAVE_NUMBA:
+        # Explicit signatures → compiled (or loaded from cache) at import, not on first bar
+        for k in (ind.ema_last, ind.ema_extend, ind.atr_last, ind.rsi_last, ind.rsi_last_pair, ind.trend_bias,
+                  ind.breakout_ref_ok, ind.breakout_guard_ok):
+            assert k.signatures, f"{k.__name__} has no precompiled signature"
+
+    closes = np.array([100.0, 101.5, 100.8, 102.2, 101.9, 103.4, 102.7, 104.1, 103.3, 104.8])
+    for period in (3, 8, 9):
+        cur, prev = ind.rsi_last_pair(closes, period)
+        assert cur == ind.rsi_last(closes, period)
+        exp_prev = ind.rsi_last(closes[:-1], period)
+        assert prev == exp_prev or (prev != prev and exp_prev != exp_prev)
+    # Column views of an (N, 5) kline array are valid inputs
+    arr = np.column_stack([closes] * 5)
+    assert ind.ema_last(arr[:, 3], 0, 5) == ind.ema_last(np.ascontiguousarray(closes), 0, 5)
+
+    # Breakout timing guard: compiled scan and NumPy twin agree
+    highs, lows = closes + 0.5, closes - 0.5
+    for is_long, entry in ((True, 105.0), (True, 105.6), (False, 100.0), (False, 99.2)):
+        for late, pb in ((0.5, 0.0), (0.0, 0.1), (0.2, 0.2)):
+            got = ind.breakout_guard_ok(highs, lows, 2, 10, is_long, entry, late, pb)
+            assert got == ind._breakout_guard_np(highs, lows, 2, 10, is_long, entry, late, pb)
+
+    print("  ✓ _indicators — precompiled signatures, rsi_last_pair parity, strided views, breakout guard")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# 11. backtest/parallel — run_parallel call conventions, 1 vs 2 workers
+# ─────────────────────────────────────────────────────────────────────────────
+def _parallel_test_store(symbol: str):
+    # Module-level so worker processes can unpickle it; seeded by symbol.
+    import random
+    from backtest.engine import Candle, KlineStore
+
+    rnd = random.Random(symbol)
+    p, drift, candles = 30000.0, 0.0, []
+    for i in range(12 * 24 * 10):
+        if i % 600 == 0:
+            drift = rnd.choice([-1, 1]) * rnd.random() * 0.001
+        o = p
+        c = o * (1 + drift + rnd.gauss(0, 0.003))
+        h = max(o, c) * (1 + abs(rnd.gauss(0, 0.0015)))
+        l = min(o, c) * (1 - abs(rnd.gauss(0, 0.0015)))
+        candles.append(Candle(ts=1700000000000 + i * 300000, o=o, h=h, l=l, c=c, v=rnd.random() * 100))
+        p = c
+    return KlineStore(symbol, candles)
+
+
+def test_run_parallel():
+    from archive.strategies_retired.bounce_bt import BounceBTStrategy
+    from backtest.parallel import ohlcv_signal, price_signal, run_parallel, sync_price_signal
+    from strategies.btc_eth_midterm_pullback import BTCETHMidtermPullbackStrategy
+    from strategies.inplay_breakout import InPlayBreakoutWrapper
+
+    symbols = ["BTCUSDT", "ETHUSDT"]
+    for factory, signal_fn in (
+        (BTCETHMidtermPullbackStrategy, ohlcv_signal),
+        (BounceBTStrategy, price_signal),
+        (InPlayBreakoutWrapper, sync_price_signal),
+    ):
+        serial = run_parallel(symbols, _parallel_test_store, factory, 1, signal_fn=signal_fn)
+        pooled = run_parallel(symbols, _parallel_test_store, factory, 2, signal_fn=signal_fn)
+        assert list(serial) == list(pooled) == symbols
+        for sym in symbols:
+            a = [(i, vars(sig)) for i, sig in serial[sym]]
+            b = [(i, vars(sig)) for i, sig in pooled[sym]]
+            assert a == b, f"{factory.__name__} {sym}: 1 vs 2 workers differ"
+    assert serial["ETHUSDT"], "breakout replay should produce signals"
+
+    print("  ✓ backtest.parallel.run_parallel — ohlcv/price/sync conventions, 1 vs 2 workers identical")
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Runner
 # ─────────────────────────────────────────────────────────────────────────────
@@ -325,6 +442,9 @@ if __name__ == "__main__":
         test_trade_state,
         test_news_filter,
         test_diagnostics_snapshot,
+        test_midterm_env_snapshot,
+        test_indicator_kernels,
+        test_run_parallel,
     ]
     print(f"\n{'─' * 55}")
     print("  smoke_test.py — running all tests")